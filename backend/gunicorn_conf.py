@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for production.
+
+    gunicorn main:app -c gunicorn_conf.py
+
+Each worker is a separate process with its own event loop and database pool,
+so DB_POOL_SIZE is per worker: workers x (pool size + overflow) must stay under
+the database's max_connections.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Keep idle connections open longer than typical load balancer timeouts (60s)
+keepalive = 75
+timeout = 120
+graceful_timeout = 30
+
+# Requests are logged (sampled) by the app; see SampledAccessLogMiddleware
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
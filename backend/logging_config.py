@@ -0,0 +1,71 @@
+"""
+Logging setup for AIDA.
+
+Records from structlog and the standard library are rendered as JSON lines by a
+background QueueListener thread, so request handlers only enqueue a record and
+never block on a stream write.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Optional
+
+import structlog
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+_shared_processors = [
+    structlog.stdlib.add_log_level,
+    structlog.stdlib.add_logger_name,
+    structlog.processors.TimeStamper(fmt="iso", utc=True),
+]
+
+
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats the message here, on the calling thread
+        return record
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """Route all logging through a queue to a JSON stream handler"""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv("LOG_LEVEL", "info")).upper()
+
+    structlog.configure(
+        processors=[*_shared_processors, structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processor=structlog.processors.JSONRenderer(),
+        foreign_pre_chain=_shared_processors,
+    ))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [_EnqueueHandler(log_queue)]
+    root.setLevel(level)
+
+    # Requests are logged by the sampled access-log middleware instead
+    logging.getLogger("uvicorn.access").disabled = True
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: Optional[str] = None):
+    """Structured logger bound to the given name"""
+    return structlog.get_logger(name)
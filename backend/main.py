@@ -1,16 +1,22 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, WebSocket
+from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
-from typing import List, Optional
+from typing import Annotated, Any, Dict, List, Optional
+import orjson
 import os
+import re
+import sys
 from dotenv import load_dotenv
 
-from models.database import engine, Base
+from logging_config import configure_logging, get_logger
+from middleware import CompressionMiddleware, SampledAccessLogMiddleware, SecurityHeadersMiddleware
+from models.database import engine, Base, warm_pool
 from models.schemas import (
+    ADDRESS_PATTERN,
     DAOHealthResponse, 
     ProposalAnalysisRequest, 
     ProposalAnalysisResponse,
@@ -18,10 +24,12 @@ from models.schemas import (
     ActionExecutionRequest,
     ActionExecutionResponse,
     TreasuryAnalysisResponse,
-    GovernanceMetricsResponse
+    GovernanceMetricsResponse,
+    CrossChainAssetResponse
 )
-from services.ai_service import AIService
-from services.dao_service import DAOService
+from services.ai_service import close_openai_clients, get_ai_service
+from services.cache_service import ResponseCache
+from services.dao_service import get_dao_service
 from services.hathor_service import HathorService
 from services.proposal_service import ProposalService
 from services.treasury_service import TreasuryService
@@ -29,17 +37,39 @@ from services.treasury_service import TreasuryService
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+configure_logging()
+log = get_logger("aida")
+
+# Use the libuv-based event loop when available (not supported on Windows)
+if sys.platform != "win32":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🚀 Starting AIDA - AI-Driven DAO Analyst")
+    log.info("startup", service="AIDA")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await warm_pool()
+    await proposal_service.analysis_writer.start()
+    await dao_service.report_writer.start()
+    await hathor_service.rpc_batcher.start()
     yield
     # Shutdown
-    print("🛑 Shutting down AIDA")
+    log.info("shutdown", service="AIDA")
+    await proposal_service.analysis_writer.stop()
+    await dao_service.report_writer.stop()
+    await hathor_service.rpc_batcher.stop()
+    await hathor_service.aclose()
+    await close_openai_clients()
+    await engine.dispose()
 
+# JSON routes declare a response_model so FastAPI serializes them to bytes in
+# pydantic-core directly; a custom response class would bypass that path
 app = FastAPI(
     title="AIDA - AI-Driven DAO Analyst",
     description="Intelligent financial and governance analyst for DAOs",
@@ -57,23 +87,55 @@ app.add_middleware(
 )
 
 # Add security headers middleware
-@app.middleware("http")
-async def add_security_headers(request, call_next):
-    response: Response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Permissions-Policy"] = "geolocation=(), microphone=()"
-    return response
+app.add_middleware(SecurityHeadersMiddleware)
+
+# Compress large JSON payloads (treasury, governance, cross-chain)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Sampled access log; uvicorn's per-request access log is disabled
+app.add_middleware(SampledAccessLogMiddleware, sample_every=100)
 
 # Initialize services
-ai_service = AIService()
-dao_service = DAOService()
+ai_service = get_ai_service()
+dao_service = get_dao_service()
 hathor_service = HathorService()
 proposal_service = ProposalService()
 treasury_service = TreasuryService()
 
+# Dashboards poll per-DAO snapshots; serve them from a short-lived cache
+response_cache = ResponseCache(namespace="resp", ttl=30)
+
+def dao_cache_keys(dao_address: str) -> List[str]:
+    """Cache keys of every snapshot derived from a DAO's on-chain state"""
+    return [f"health:{dao_address}", f"treasury:{dao_address}", f"gov:{dao_address}"]
+
+_ADDR_RE = re.compile(ADDRESS_PATTERN)
+
+def valid_addr(dao_address: str) -> str:
+    """Reject malformed DAO addresses before any cache, service or DB work"""
+    if not _ADDR_RE.match(dao_address):
+        raise HTTPException(status_code=422, detail="Invalid DAO address")
+    return dao_address
+
+DAOAddress = Annotated[str, Depends(valid_addr)]
+
+SNAPSHOT_CACHE_CONTROL = "private, max-age=30"
+
+def _opaque_tag(etag: str) -> str:
+    return etag.strip().replace("W/", "", 1)
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Tag the response; return a 304 when the client already holds this version"""
+    headers = {"ETag": etag, "Cache-Control": SNAPSHOT_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+        candidates = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+        if _opaque_tag(etag) in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -85,45 +147,71 @@ async def root():
     }
 
 @app.get("/health")
-async def health_check():
+@app.head("/health", include_in_schema=False)
+async def health_check(request: Request, response: Response):
     """Health check endpoint"""
+    cached = not_modified(request, response, 'W/"healthy"')
+    if cached is not None:
+        return cached
     return {"status": "healthy", "service": "AIDA"}
 
+async def analyze_and_store_health(dao_address: str) -> DAOHealthResponse:
+    """Fresh health analysis, queued for storage so each computed report is kept"""
+    health_data = await dao_service.analyze_dao_health(dao_address)
+    await dao_service.store_dao_health_report(dao_address, health_data)
+    return health_data
+
 @app.get("/api/dao/{dao_address}/health", response_model=DAOHealthResponse)
-async def get_dao_health(dao_address: str):
+@app.head("/api/dao/{dao_address}/health", include_in_schema=False)
+async def get_dao_health(dao_address: DAOAddress, request: Request, response: Response):
     """
     Get comprehensive health analysis of a DAO
     """
     try:
-        health_data = await dao_service.analyze_dao_health(dao_address)
+        health_data = await response_cache.get_or_load(
+            f"health:{dao_address}",
+            lambda: analyze_and_store_health(dao_address),
+            DAOHealthResponse
+        )
+        
+        etag = f'W/"{int(health_data.last_updated.timestamp())}-{health_data.overall_health_score:.3f}"'
+        cached = not_modified(request, response, etag)
+        if cached is not None:
+            return cached
         
         return health_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing DAO health: {str(e)}")
 
 @app.post("/api/proposals/analyze", response_model=ProposalAnalysisResponse)
-async def analyze_proposal(
-    request: ProposalAnalysisRequest,
-    background_tasks: BackgroundTasks
-):
+async def analyze_proposal(request: ProposalAnalysisRequest):
     """
     Analyze a governance proposal using AI
     """
     try:
-        # Add to background tasks for async processing
-        background_tasks.add_task(proposal_service.store_analysis, request)
+        # Analyze proposal (served from the analysis cache when possible)
+        analysis = await proposal_service.analyze_proposal(request)
         
-        # Analyze proposal
-        analysis_result = await ai_service.analyze_proposal(request.dict())
-        
-        return ProposalAnalysisResponse(
-            proposal_id=request.proposal_id,
-            dao_address=request.dao_address,
-            **analysis_result
-        )
+        # Queue the proposal with its results for batched storage
+        await proposal_service.store_analysis(request, analysis)
+        return analysis
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing proposal: {str(e)}")
 
+@app.post("/api/proposals/summary/stream")
+async def stream_proposal_summary(request: ProposalAnalysisRequest):
+    """
+    Stream the AI-generated summary of a proposal as server-sent events
+    """
+    async def events():
+        async for text in ai_service.stream_summary(request.description):
+            yield f"data: {orjson.dumps(text).decode()}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    
+    # Compression middleware passes text/event-stream through unbuffered
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
 @app.get("/api/proposals/{proposal_id}/summary", response_model=ProposalSummaryResponse)
 async def get_proposal_summary(proposal_id: str):
     """
@@ -140,36 +228,55 @@ async def execute_action(request: ActionExecutionRequest):
     """
     Execute automated action using Hathor Nano Contracts
     """
+    # The address names the cache entries to drop, so it must be well-formed
+    valid_addr(request.dao_address)
     try:
         result = await hathor_service.execute_action(request)
+        # Snapshots are rebuilt from fresh DAO data, not the cached pre-action metrics
+        await dao_service.invalidate(request.dao_address)
+        await response_cache.invalidate(*dao_cache_keys(request.dao_address))
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error executing action: {str(e)}")
 
 @app.get("/api/treasury/{dao_address}/analysis", response_model=TreasuryAnalysisResponse)
-async def analyze_treasury(dao_address: str):
+@app.head("/api/treasury/{dao_address}/analysis", include_in_schema=False)
+async def analyze_treasury(dao_address: DAOAddress, request: Request, response: Response):
     """
     Get AI-powered treasury analysis
     """
     try:
-        analysis = await treasury_service.analyze_treasury(dao_address)
+        analysis = await response_cache.get_or_load(
+            f"treasury:{dao_address}",
+            lambda: treasury_service.analyze_treasury(dao_address),
+            TreasuryAnalysisResponse
+        )
+        
+        etag = f'W/"{int(analysis.last_updated.timestamp())}-{analysis.total_value_usd:.2f}-{analysis.risk_score:.3f}"'
+        cached = not_modified(request, response, etag)
+        if cached is not None:
+            return cached
         return analysis
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing treasury: {str(e)}")
 
 @app.get("/api/governance/{dao_address}/metrics", response_model=GovernanceMetricsResponse)
-async def get_governance_metrics(dao_address: str):
+async def get_governance_metrics(dao_address: DAOAddress):
     """
     Get governance metrics and predictions
     """
     try:
-        metrics = await dao_service.get_governance_metrics(dao_address)
+        metrics = await response_cache.get_or_load(
+            f"gov:{dao_address}",
+            lambda: dao_service.get_governance_metrics(dao_address),
+            GovernanceMetricsResponse
+        )
         return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting governance metrics: {str(e)}")
 
-@app.get("/api/predictions/{dao_address}/proposals")
-async def get_proposal_predictions(dao_address: str, limit: int = 10):
+@app.get("/api/predictions/{dao_address}/proposals", response_model=List[Dict[str, Any]])
+async def get_proposal_predictions(dao_address: DAOAddress, limit: int = 10):
     """
     Get AI predictions for upcoming proposals
     """
@@ -179,8 +286,8 @@ async def get_proposal_predictions(dao_address: str, limit: int = 10):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting predictions: {str(e)}")
 
-@app.get("/api/cross-chain/{dao_address}/assets")
-async def get_cross_chain_assets(dao_address: str):
+@app.get("/api/cross-chain/{dao_address}/assets", response_model=CrossChainAssetResponse)
+async def get_cross_chain_assets(dao_address: DAOAddress):
     """
     Get cross-chain asset analysis via Hathor EVM Bridge
     """
@@ -191,10 +298,16 @@ async def get_cross_chain_assets(dao_address: str):
         raise HTTPException(status_code=500, detail=f"Error getting cross-chain assets: {str(e)}")
 
 if __name__ == "__main__":
+    # Development server only; production runs gunicorn with gunicorn_conf.py
+    if not os.getenv("AIDA_DEV"):
+        sys.exit("Set AIDA_DEV=1 to run the development server, or run: gunicorn main:app -c gunicorn_conf.py")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+        log_level="info",
+        access_log=False,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools"
+    )
@@ -0,0 +1,163 @@
+"""
+ASGI middleware for AIDA.
+
+These are plain ASGI callables rather than ``BaseHTTPMiddleware`` subclasses,
+so they add no per-request task or response wrapping.
+"""
+import itertools
+import time
+from typing import Dict
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+
+from logging_config import get_logger
+
+try:
+    from brotli_asgi import BrotliResponder, Mode
+except ImportError:  # Brotli is optional; gzip is always available
+    BrotliResponder = None
+
+# Sent as they are produced; a compressor would buffer them (gzip already skips these)
+STREAMING_CONTENT_TYPES = frozenset({"text/event-stream"})
+
+
+def _media_type(message) -> str:
+    """Lowercased media type of an http.response.start message"""
+    return Headers(raw=message["headers"]).get("content-type", "").partition(";")[0].strip().lower()
+
+
+def _accepted_codings(scope) -> Dict[str, float]:
+    """Content-codings listed in Accept-Encoding, with their q-values"""
+    codings = {}
+    for name, value in scope["headers"]:
+        if name != b"accept-encoding":
+            continue
+        for item in value.decode("latin-1").split(","):
+            coding, _, params = item.partition(";")
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, raw = param.partition("=")
+                if key.strip().lower() == "q":
+                    try:
+                        quality = float(raw)
+                    except ValueError:
+                        quality = 0.0
+            if coding.strip():
+                codings[coding.strip().lower()] = quality
+    return codings
+
+
+def _quality(codings: Dict[str, float], coding: str) -> float:
+    """q-value of a coding, falling back to the * wildcard; 0 means not acceptable"""
+    return codings.get(coding, codings.get("*", 0.0))
+
+
+if BrotliResponder is not None:
+    class _BrotliResponder(BrotliResponder):
+        """BrotliResponder that passes streaming content types through uncompressed"""
+
+        passthrough = False
+
+        async def send_with_brotli(self, message):
+            if message["type"] == "http.response.start":
+                self.passthrough = _media_type(message) in STREAMING_CONTENT_TYPES
+            if self.passthrough:
+                await self.send(message)
+            else:
+                await super().send_with_brotli(message)
+
+
+class SecurityHeadersMiddleware:
+    """Append fixed security headers to every HTTP response"""
+
+    HEADERS = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+        (b"permissions-policy", b"geolocation=(), microphone=()"),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + self.HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class CompressionMiddleware:
+    """Compress responses with Brotli or gzip, whichever the client prefers (Brotli on ties)"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli_quality = brotli_quality
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codings = _accepted_codings(scope)
+        br = _quality(codings, "br") if BrotliResponder is not None else 0.0
+        gzip = _quality(codings, "gzip")
+        if br > 0 and br >= gzip:
+            responder = _BrotliResponder(
+                self.app, quality=self.brotli_quality, mode=Mode.text,
+                lgwin=22, lgblock=0, minimum_size=self.minimum_size,
+            )
+            await responder(scope, receive, send)
+        elif gzip > 0:
+            await self.gzip(scope, receive, send)
+        else:
+            # Identity: q=0 on a coding means the client refuses it
+            await self.app(scope, receive, send)
+
+
+class SampledAccessLogMiddleware:
+    """Log one in every ``sample_every`` requests, plus every server error"""
+
+    def __init__(self, app, sample_every: int = 100):
+        self.app = app
+        self.sample_every = sample_every
+        self._counter = itertools.count()
+        self._log = get_logger("aida.access")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sampled = next(self._counter) % self.sample_every == 0
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if sampled or status_code >= 500:
+                self._log.info(
+                    "request",
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                    sample_rate=1 / self.sample_every,
+                )
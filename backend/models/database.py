@@ -1,25 +1,90 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index, JSON, Uuid, text
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import relationship
+from sqlalchemy.pool import NullPool
 from datetime import datetime
+from typing import Optional
+import asyncio
 import os
+import uuid
 from dotenv import load_dotenv
 
+from models.schemas import ActionType, ProposalStatus, RiskLevel
+
 load_dotenv()
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./aida.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _async_database_url(url: str) -> str:
+    """Map a sync driver URL onto its asyncio driver"""
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL)
+
+# Behind PgBouncer in transaction mode the bouncer owns pooling, and server-side
+# prepared statements cannot be reused across transactions
+USE_PGBOUNCER = os.getenv("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
+
+_engine_options = {}
+if USE_PGBOUNCER:
+    _engine_options["poolclass"] = NullPool
+    if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg://"):
+        ASYNC_DATABASE_URL = make_url(ASYNC_DATABASE_URL).update_query_dict(
+            {"prepared_statement_cache_size": "0"}
+        ).render_as_string(hide_password=False)
+        _engine_options["connect_args"] = {
+            "statement_cache_size": 0,
+            # asyncpg names its unnamed statements sequentially per connection; unique
+            # names keep them from colliding on the server connections PgBouncer shares
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+# In-memory SQLite runs on a single static connection and takes no pool sizing
+elif ":memory:" not in ASYNC_DATABASE_URL:
+    _engine_options = {
+        # Sized per worker process; see gunicorn_conf.py
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        # Fail fast when the pool is exhausted instead of stalling the event loop
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "2")),
+        "pool_pre_ping": True,
+    }
+
+engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **_engine_options)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
+# Structured fields are stored parsed: JSONB on Postgres, JSON text on SQLite
+JSONType = JSONB().with_variant(JSON(), "sqlite")
+
+# Surrogate keys are 64-bit; SQLite only autoincrements an INTEGER PRIMARY KEY
+BigIntegerType = BigInteger().with_variant(Integer(), "sqlite")
+
+# DAO contract addresses: 0x + 40 hex characters
+ADDRESS_LENGTH = 42
+
+def _enum_type(enum_class, name: str) -> SAEnum:
+    """Native Postgres ENUM persisting the lowercase enum values"""
+    return SAEnum(
+        enum_class,
+        name=name,
+        values_callable=lambda members: [member.value for member in members],
+        validate_strings=True,
+    )
+
 class DAO(Base):
     __tablename__ = "daos"
     
-    id = Column(Integer, primary_key=True, index=True)
-    address = Column(String, unique=True, index=True)
+    address = Column(String(ADDRESS_LENGTH), primary_key=True)
     name = Column(String)
     description = Column(Text)
     treasury_address = Column(String)
@@ -27,43 +92,46 @@ class DAO(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
+    # Relationships (all unbounded histories, so they stay lazy and are
+    # eager-loaded per query where a route serializes them)
     proposals = relationship("Proposal", back_populates="dao")
     treasury_analyses = relationship("TreasuryAnalysis", back_populates="dao")
     health_reports = relationship("DAOHealthReport", back_populates="dao")
 
 class Proposal(Base):
     __tablename__ = "proposals"
+    __table_args__ = (
+        Index("ix_prop_dao_status_end", "dao_address", "status", "voting_end"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    proposal_id = Column(String, unique=True, index=True)
-    dao_id = Column(Integer, ForeignKey("daos.id"))
+    proposal_id = Column(String, primary_key=True)
+    dao_address = Column(String(ADDRESS_LENGTH), ForeignKey("daos.address"))
     title = Column(String)
     description = Column(Text)
     proposer = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     voting_start = Column(DateTime)
     voting_end = Column(DateTime)
-    status = Column(String)  # active, passed, failed, executed
+    status = Column(_enum_type(ProposalStatus, "proposal_status"))
     
     # AI Analysis fields
     ai_prediction = Column(Float)  # 0-1 probability of passing
     ai_confidence = Column(Float)  # 0-1 confidence in prediction
     ai_summary = Column(Text)
-    ai_risk_assessment = Column(String)  # low, medium, high
-    ai_recommendations = Column(Text)
+    ai_risk_assessment = Column(_enum_type(RiskLevel, "risk_level"))
+    ai_recommendations = Column(JSONType)
     
     # Relationships
     dao = relationship("DAO", back_populates="proposals")
-    analysis = relationship("ProposalAnalysis", back_populates="proposal", uselist=False)
+    analysis = relationship("ProposalAnalysis", back_populates="proposal", uselist=False, lazy="selectin")
 
 class ProposalAnalysis(Base):
     __tablename__ = "proposal_analyses"
     
-    id = Column(Integer, primary_key=True, index=True)
-    proposal_id = Column(Integer, ForeignKey("proposals.id"))
+    id = Column(BigIntegerType, primary_key=True)
+    proposal_id = Column(String, ForeignKey("proposals.proposal_id"))
     analysis_type = Column(String)  # sentiment, risk, impact, etc.
-    analysis_data = Column(Text)  # JSON string of analysis results
+    analysis_data = Column(JSONType)  # analysis results
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -71,14 +139,17 @@ class ProposalAnalysis(Base):
 
 class TreasuryAnalysis(Base):
     __tablename__ = "treasury_analyses"
+    __table_args__ = (
+        Index("ix_ta_dao_created", "dao_address", "created_at"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    dao_id = Column(Integer, ForeignKey("daos.id"))
+    id = Column(BigIntegerType, primary_key=True)
+    dao_address = Column(String(ADDRESS_LENGTH), ForeignKey("daos.address"))
     total_value_usd = Column(Float)
     asset_diversification_score = Column(Float)  # 0-1
     risk_score = Column(Float)  # 0-1
     liquidity_score = Column(Float)  # 0-1
-    ai_recommendations = Column(Text)
+    ai_recommendations = Column(JSONType)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -86,15 +157,18 @@ class TreasuryAnalysis(Base):
 
 class DAOHealthReport(Base):
     __tablename__ = "dao_health_reports"
+    __table_args__ = (
+        Index("ix_dhr_dao_created", "dao_address", "created_at"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    dao_id = Column(Integer, ForeignKey("daos.id"))
+    id = Column(BigIntegerType, primary_key=True)
+    dao_address = Column(String(ADDRESS_LENGTH), ForeignKey("daos.address"))
     overall_health_score = Column(Float)  # 0-1
     governance_score = Column(Float)  # 0-1
     financial_score = Column(Float)  # 0-1
     community_score = Column(Float)  # 0-1
-    risk_factors = Column(Text)  # JSON array of risk factors
-    recommendations = Column(Text)
+    risk_factors = Column(JSONType)  # list of risk factors
+    recommendations = Column(JSONType)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -102,33 +176,46 @@ class DAOHealthReport(Base):
 
 class ActionExecution(Base):
     __tablename__ = "action_executions"
+    __table_args__ = (
+        Index("ix_ae_dao_status", "dao_address", "status"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    action_type = Column(String)  # proposal_execution, treasury_rebalance, etc.
-    dao_address = Column(String)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    action_type = Column(_enum_type(ActionType, "action_type"))
+    dao_address = Column(String(ADDRESS_LENGTH))
     proposal_id = Column(String, nullable=True)
     transaction_hash = Column(String, nullable=True)
     status = Column(String)  # pending, executed, failed
-    execution_data = Column(Text)  # JSON string of execution details
+    execution_data = Column(JSONType)  # execution details
     created_at = Column(DateTime, default=datetime.utcnow)
     executed_at = Column(DateTime, nullable=True)
 
 class CrossChainAsset(Base):
     __tablename__ = "cross_chain_assets"
     
-    id = Column(Integer, primary_key=True, index=True)
-    dao_address = Column(String)
-    chain_name = Column(String)  # ethereum, polygon, etc.
-    asset_address = Column(String)
+    # The natural key doubles as the (dao_address, chain_name) lookup index
+    dao_address = Column(String(ADDRESS_LENGTH), primary_key=True)
+    chain_name = Column(String, primary_key=True)  # ethereum, polygon, etc.
+    asset_address = Column(String, primary_key=True)
     asset_symbol = Column(String)
     balance = Column(Float)
     value_usd = Column(Float)
     last_updated = Column(DateTime, default=datetime.utcnow)
 
-# Dependency to get database session
-def get_db():
-    db = SessionLocal()
+async def warm_pool(size: Optional[int] = None) -> None:
+    """Open pooled connections up front so the first requests find them ready"""
+    if isinstance(engine.pool, NullPool):
+        return
+    if size is None:
+        pool_size = getattr(engine.pool, "size", None)
+        size = pool_size() if callable(pool_size) else 1
+    conns = await asyncio.gather(*(engine.connect().start() for _ in range(size)))
     try:
-        yield db
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conns))
     finally:
-        db.close() 
\ No newline at end of file
+        await asyncio.gather(*(conn.close() for conn in conns))
+
+# Dependency to get database session
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
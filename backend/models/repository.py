@@ -0,0 +1,148 @@
+"""
+Query helpers for the ORM models.
+
+Relationships are eager-loaded with ``selectinload`` so that serializing a DAO
+and its children costs one IN-clause query per relationship instead of one
+query per parent row. Outside production every query also carries
+``raiseload("*")``, so a relationship that was not eager-loaded raises instead
+of silently issuing a blocking lazy SELECT.
+
+Histories that are only summarized, such as a DAO's health reports, are
+counted in SQL instead of being loaded.
+
+Bulk reads and writes go out as a single statement: list reads use one
+filtered ``LIMIT`` query and writes are sent as one executemany upsert.
+"""
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
+
+from models.database import DAO, DAOHealthReport, Proposal, TreasuryAnalysis
+from models.schemas import ProposalStatus
+
+# Enabled in development and tests; production keeps the silent lazy-load fallback
+STRICT_LOADING = os.getenv("AIDA_STRICT_LOADING", os.getenv("DEBUG", "false")).lower() in ("1", "true", "yes")
+
+
+def safe_options(*options):
+    """Append raiseload("*") to loader options when strict loading is enabled"""
+    if STRICT_LOADING:
+        return (*options, raiseload("*"))
+    return options
+
+
+def dao_summary_query(dao_address: str):
+    """Select a DAO with how many health reports and treasury analyses it has"""
+    # The histories are unbounded, so they are counted in SQL rather than loaded
+    health_reports = (
+        select(func.count()).where(DAOHealthReport.dao_address == DAO.address).scalar_subquery()
+    )
+    treasury_analyses = (
+        select(func.count()).where(TreasuryAnalysis.dao_address == DAO.address).scalar_subquery()
+    )
+    return (
+        select(DAO, health_reports.label("health_reports"), treasury_analyses.label("treasury_analyses"))
+        .where(DAO.address == dao_address)
+        .options(*safe_options())
+    )
+
+
+def dao_proposals_query(dao_address: str, limit: int = 20):
+    """Select a DAO's proposals with their analyses, newest first"""
+    return (
+        select(Proposal)
+        .where(Proposal.dao_address == dao_address)
+        .options(*safe_options(selectinload(Proposal.analysis)))
+        .order_by(Proposal.created_at.desc())
+        .limit(limit)
+    )
+
+
+def active_proposals_query(dao_address: str, limit: int = 10):
+    """Select a DAO's active proposals, soonest voting deadline first"""
+    return (
+        select(Proposal)
+        .where(Proposal.dao_address == dao_address, Proposal.status == ProposalStatus.ACTIVE)
+        .options(*safe_options())
+        .order_by(Proposal.voting_end)
+        .limit(limit)
+    )
+
+
+def analyzed_proposals_query(dao_address: str, limit: int = 10):
+    """Select a DAO's active proposals that have an AI prediction, with their analyses"""
+    return (
+        select(Proposal)
+        .where(Proposal.dao_address == dao_address, Proposal.status == ProposalStatus.ACTIVE,
+               Proposal.ai_prediction.is_not(None))
+        .options(*safe_options(selectinload(Proposal.analysis)))
+        .order_by(Proposal.voting_end)
+        .limit(limit)
+    )
+
+
+def _dialect_insert(session: AsyncSession):
+    """Return the insert() construct that supports ON CONFLICT for the bound dialect"""
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+async def bulk_upsert(session: AsyncSession, model, rows: Sequence[Dict[str, Any]],
+                      conflict_columns: Sequence[str], insert_only: Sequence[str] = ()) -> None:
+    """Insert or update many rows in one executemany round-trip
+
+    Columns named in ``insert_only`` are written for new rows but never overwritten.
+    """
+    if not rows:
+        return
+    stmt = _dialect_insert(session)(model)
+    # Only overwrite the columns supplied, so partial rows keep existing values
+    supplied = rows[0].keys()
+    update_columns = {
+        column.name: stmt.excluded[column.name]
+        for column in model.__table__.columns
+        if column.name in supplied and column.name not in conflict_columns
+        and column.name not in insert_only and not column.primary_key
+    }
+    stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=update_columns)
+    await session.execute(stmt, list(rows))
+
+
+async def ensure_daos(session: AsyncSession, addresses: Iterable[str]) -> None:
+    """Insert a bare row for each DAO address not stored yet, so children can link to it"""
+    rows = [{'address': address} for address in set(addresses)]
+    if not rows:
+        return
+    stmt = _dialect_insert(session)(DAO).on_conflict_do_nothing(index_elements=['address'])
+    await session.execute(stmt, rows)
+
+
+async def get_dao_summary(session: AsyncSession, dao_address: str) -> Optional[Tuple[DAO, int, int]]:
+    """Load a DAO with its health report and treasury analysis counts, in one query"""
+    result = await session.execute(dao_summary_query(dao_address))
+    row = result.one_or_none()
+    return tuple(row) if row is not None else None
+
+
+async def get_dao_proposals(session: AsyncSession, dao_address: str, limit: int = 20) -> List[Proposal]:
+    """Load a DAO's most recent proposals with their analyses"""
+    result = await session.execute(dao_proposals_query(dao_address, limit))
+    return list(result.scalars().all())
+
+
+async def get_active_proposals(session: AsyncSession, dao_address: str, limit: int = 10) -> List[Proposal]:
+    """Load a DAO's active proposals in a single round-trip"""
+    result = await session.execute(active_proposals_query(dao_address, limit))
+    return list(result.scalars().all())
+
+
+async def get_analyzed_proposals(session: AsyncSession, dao_address: str, limit: int = 10) -> List[Proposal]:
+    """Load a DAO's analyzed active proposals with their analysis records"""
+    result = await session.execute(analyzed_proposals_query(dao_address, limit))
+    return list(result.scalars().all())
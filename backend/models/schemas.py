@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -20,9 +20,20 @@ class ActionType(str, Enum):
     TOKEN_TRANSFER = "token_transfer"
     CONTRACT_INTERACTION = "contract_interaction"
 
+# Model configs: request bodies reject unknown fields; responses can be built
+# straight from ORM objects, and the hottest ones are immutable
+REQUEST_CONFIG = ConfigDict(extra="forbid")
+RESPONSE_CONFIG = ConfigDict(from_attributes=True)
+FROZEN_RESPONSE_CONFIG = ConfigDict(from_attributes=True, frozen=True)
+
+# DAO contract addresses: 0x + 40 hex characters, matching the String(42) columns
+ADDRESS_PATTERN = r"^0x[a-fA-F0-9]{40}$"
+
 # Request Models
 class ProposalAnalysisRequest(BaseModel):
-    dao_address: str = Field(..., description="DAO contract address")
+    model_config = REQUEST_CONFIG
+    
+    dao_address: str = Field(..., pattern=ADDRESS_PATTERN, description="DAO contract address")
     proposal_id: str = Field(..., description="Unique proposal identifier")
     title: str = Field(..., description="Proposal title")
     description: str = Field(..., description="Full proposal description")
@@ -31,14 +42,18 @@ class ProposalAnalysisRequest(BaseModel):
     voting_end: Optional[datetime] = Field(None, description="Voting end time")
 
 class ActionExecutionRequest(BaseModel):
+    model_config = REQUEST_CONFIG
+    
     action_type: ActionType = Field(..., description="Type of action to execute")
-    dao_address: str = Field(..., description="DAO contract address")
+    dao_address: str = Field(..., pattern=ADDRESS_PATTERN, description="DAO contract address")
     proposal_id: Optional[str] = Field(None, description="Related proposal ID if applicable")
     parameters: Dict[str, Any] = Field(default_factory=dict, description="Action parameters")
     gas_limit: Optional[int] = Field(None, description="Gas limit for transaction")
 
 # Response Models
 class DAOHealthResponse(BaseModel):
+    model_config = FROZEN_RESPONSE_CONFIG
+    
     dao_address: str
     overall_health_score: float = Field(..., ge=0, le=1, description="Overall health score (0-1)")
     governance_score: float = Field(..., ge=0, le=1, description="Governance health score (0-1)")
@@ -50,6 +65,8 @@ class DAOHealthResponse(BaseModel):
     analysis_confidence: float = Field(..., ge=0, le=1, description="Confidence in analysis (0-1)")
 
 class ProposalAnalysisResponse(BaseModel):
+    model_config = FROZEN_RESPONSE_CONFIG
+    
     proposal_id: str
     dao_address: str
     prediction: float = Field(..., ge=0, le=1, description="Predicted probability of passing (0-1)")
@@ -63,6 +80,8 @@ class ProposalAnalysisResponse(BaseModel):
     created_at: datetime
 
 class ProposalSummaryResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     proposal_id: str
     title: str
     summary: str = Field(..., description="AI-generated summary")
@@ -73,6 +92,8 @@ class ProposalSummaryResponse(BaseModel):
     created_at: datetime
 
 class ActionExecutionResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     action_id: str
     action_type: ActionType
     dao_address: str
@@ -84,6 +105,8 @@ class ActionExecutionResponse(BaseModel):
     created_at: datetime
 
 class TreasuryAnalysisResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     dao_address: str
     total_value_usd: float = Field(..., description="Total treasury value in USD")
     asset_diversification_score: float = Field(..., ge=0, le=1, description="Diversification score (0-1)")
@@ -96,6 +119,8 @@ class TreasuryAnalysisResponse(BaseModel):
     last_updated: datetime
 
 class GovernanceMetricsResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     dao_address: str
     total_proposals: int = Field(..., description="Total number of proposals")
     active_proposals: int = Field(..., description="Currently active proposals")
@@ -108,6 +133,8 @@ class GovernanceMetricsResponse(BaseModel):
     last_updated: datetime
 
 class CrossChainAssetResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     dao_address: str
     total_cross_chain_value: float = Field(..., description="Total value across all chains")
     assets_by_chain: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict, description="Assets grouped by chain")
@@ -117,6 +144,8 @@ class CrossChainAssetResponse(BaseModel):
     last_updated: datetime
 
 class PredictionResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+    
     dao_address: str
     predictions: List[Dict[str, Any]] = Field(default_factory=list, description="List of predictions")
     confidence_scores: Dict[str, float] = Field(default_factory=dict, description="Confidence scores for predictions")
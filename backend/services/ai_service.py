@@ -1,39 +1,314 @@
+import hashlib
+import httpx
+import joblib
 import openai
 import os
-import json
 import numpy as np
+import orjson
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
-from typing import Dict, List, Any, Tuple, Optional
+from sklearn.utils.validation import check_is_fitted
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Dict, FrozenSet, List, Any, Mapping, Tuple, Optional
 import asyncio
+import random
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
 import logging
+import re
+from scipy import sparse
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from models.schemas import RiskLevel
+from services.cache_service import SemanticCache, content_digest
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Near-duplicate proposals reuse an earlier completion above this cosine similarity
+LLM_CACHE_THRESHOLD = 0.95
+LLM_CACHE_TTL = 24 * 3600
+LLM_CACHE_SIZE = 4096
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+
+# Fitted models are cached here across restarts and shared by workers
+MODEL_DIR = os.getenv("AIDA_MODEL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "artifacts"))
+
+# Fitted (vectorizer, classifier) by artifact path, shared by AIService instances
+_FITTED_MODELS: Dict[str, Tuple[Any, RandomForestClassifier]] = {}
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+# In-flight completions per process, kept under the account's rate limit
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "50"))
+
+VECTORIZE_CACHE_SIZE = 2048
+
+TEXT_FEATURES = 1024
+
+# Proposal text sent with the combined analysis prompt
+PROMPT_CHARS = 1500
+
+# Bulk analysis through the OpenAI Batch API (half price, results within the window)
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = float(os.getenv("OPENAI_BATCH_POLL_INTERVAL", "30"))
+_BATCH_DONE = frozenset({"completed", "failed", "expired", "cancelled"})
+
+PROPOSAL_ANALYSIS_PROMPT = (
+    "You are an expert analyst of DAO governance proposals. Analyze the proposal and return a JSON object "
+    "with exactly these fields: "
+    "\"sentiment\": a number between -1 (very negative) and 1 (very positive); "
+    "\"summary\": a clear, concise summary in 2-3 sentences; "
+    "\"risk\": {\"risk_level\": \"low/medium/high\", \"risk_factors\": [\"factor1\", \"factor2\"], \"risk_score\": 0.0-1.0}; "
+    "\"impact\": {\"treasury_impact\": {\"score\": 0.0-1.0, \"description\": \"...\"}, \"governance_impact\": {...}, "
+    "\"community_impact\": {...}, \"technical_impact\": {...}}; "
+    "\"key_points\": an array of 3-5 key points as strings."
+)
+
+_ANALYSIS_PARAMS: Mapping[str, Any] = MappingProxyType({
+    "max_tokens": 800,
+    "temperature": 0.2,
+    "response_format": {"type": "json_object"}
+})
+
+_SUMMARY_PARAMS: Mapping[str, Any] = MappingProxyType({"max_tokens": 150, "temperature": 0.3})
+
+# System prompts for the single-aspect helpers
+SENTIMENT_PROMPT = "You are a sentiment analysis expert. Analyze the sentiment of the given DAO proposal text and return a score between -1 (very negative) and 1 (very positive). Return only the numeric score."
+SUMMARY_PROMPT = "You are an expert at summarizing DAO governance proposals. Create a clear, concise summary in 2-3 sentences that captures the key points and intent."
+RISK_PROMPT = "You are a risk assessment expert for DAO governance. Analyze the risk level (low/medium/high) and identify specific risk factors. Return JSON format: {\"risk_level\": \"low/medium/high\", \"risk_factors\": [\"factor1\", \"factor2\"], \"risk_score\": 0.0-1.0}"
+IMPACT_PROMPT = "You are an expert at analyzing DAO governance proposal impacts. Analyze the potential impact on treasury, governance, community, and technical aspects. Return JSON format: {\"treasury_impact\": {\"score\": 0.0-1.0, \"description\": \"...\"}, \"governance_impact\": {...}, \"community_impact\": {...}, \"technical_impact\": {...}}"
+KEY_POINTS_PROMPT = "Extract 3-5 key points from this DAO proposal. Return as a JSON array of strings."
+RECOMMENDATIONS_PROMPT = "Based on the analysis results, provide 2-3 actionable recommendations for DAO members. Focus on voting guidance and risk mitigation."
+
+# Mock per-asset (risk, liquidity) (in production, would use real market data)
+_ASSET_PROFILES: Mapping[str, Tuple[float, float]] = MappingProxyType({
+    'USDC': (0.1, 1.0), 'USDT': (0.1, 1.0), 'DAI': (0.1, 1.0),  # Stablecoins
+    'ETH': (0.6, 0.9), 'BTC': (0.7, 0.9),  # Major cryptos
+    'UNI': (0.8, 0.7), 'AAVE': (0.8, 0.6), 'COMP': (0.8, 0.6)  # DeFi tokens
+})
+_DEFAULT_PROFILE = (0.5, 0.5)
+
+# The profiles as a (symbol id -> risk, liquidity) matrix; the last row is for unknown symbols
+_SYMBOL_TO_ID: Mapping[str, int] = MappingProxyType({symbol: i for i, symbol in enumerate(_ASSET_PROFILES)})
+_UNKNOWN_ID = len(_SYMBOL_TO_ID)
+_PROFILE_MATRIX = np.array([*_ASSET_PROFILES.values(), _DEFAULT_PROFILE], dtype=np.float64)
+_PROFILE_MATRIX.setflags(write=False)
+
+TOP_HOLDINGS = 5
+
+# Shared by the fallback scorers, so the hot path allocates no RNG or keyword lists
+_RNG = random.Random()
+
+# Keyword groups for the fallback scorers, matched as substrings like `word in text`
+_POSITIVE_WORDS = frozenset({'improve', 'enhance', 'optimize', 'increase', 'benefit', 'positive'})
+_NEGATIVE_WORDS = frozenset({'reduce', 'decrease', 'risk', 'danger', 'negative', 'problem'})
+_TREASURY_WORDS = frozenset({'treasury', 'fund', 'allocation'})
+_FINANCIAL_WORDS = _TREASURY_WORDS | {'money'}
+_FUNDING_WORDS = frozenset({'treasury', 'fund', 'money'})
+_GOVERNANCE_WORDS = frozenset({'governance', 'voting'})
+_GOVERNANCE_PROPOSAL_WORDS = _GOVERNANCE_WORDS | {'proposal'}
+_SECURITY_WORDS = frozenset({'security', 'safety', 'protection'})
+_SAFETY_WORDS = frozenset({'security', 'safety'})
+
+FALLBACK_KEYWORDS = frozenset().union(
+    _POSITIVE_WORDS, _NEGATIVE_WORDS, _FINANCIAL_WORDS, _GOVERNANCE_PROPOSAL_WORDS, _SECURITY_WORDS
+)
+_KEYWORD_RE = re.compile("|".join(sorted(map(re.escape, FALLBACK_KEYWORDS), key=len, reverse=True)))
+
+# Mock training data - in production this would come from historical DAO data.
+# Module-level so every AIService in the process shares one copy.
+_TRAINING_DATA = pd.DataFrame({
+    'proposal_text': [
+        "Increase treasury allocation to DeFi protocols",
+        "Reduce governance token supply",
+        "Add new validator to the network",
+        "Update smart contract parameters",
+        "Distribute rewards to token holders",
+        "Implement new security measures",
+        "Change voting mechanism",
+        "Allocate funds for development",
+        "Update tokenomics model",
+        "Implement cross-chain bridge"
+    ],
+    'proposer_reputation': [0.8, 0.6, 0.9, 0.7, 0.5, 0.8, 0.4, 0.7, 0.6, 0.8],
+    'proposal_complexity': [0.6, 0.8, 0.4, 0.7, 0.3, 0.9, 0.8, 0.5, 0.7, 0.6],
+    'community_sentiment': [0.7, 0.3, 0.8, 0.5, 0.9, 0.6, 0.2, 0.7, 0.4, 0.7],
+    'financial_impact': [0.8, 0.9, 0.3, 0.6, 0.7, 0.5, 0.8, 0.6, 0.8, 0.5],
+    'passed': [1, 0, 1, 0, 1, 1, 0, 1, 0, 1]
+})
+
+# Fallback responses for demo purposes when OpenAI is unavailable
+_FALLBACK_RESPONSES = {
+    'summaries': [
+        "This proposal aims to improve the DAO's governance structure by implementing new voting mechanisms.",
+        "The proposal suggests reallocating treasury funds to optimize yield generation and risk management.",
+        "This governance proposal focuses on enhancing security measures and implementing new safety protocols.",
+        "The proposal recommends updating tokenomics to better align incentives and improve token utility.",
+        "This proposal suggests expanding the DAO's presence across multiple blockchain networks."
+    ],
+    'key_points': [
+        ["Improves governance efficiency", "Reduces voting complexity", "Enhances community participation"],
+        ["Optimizes treasury allocation", "Increases yield potential", "Reduces risk exposure"],
+        ["Enhances security protocols", "Implements new safety measures", "Protects user funds"],
+        ["Updates token distribution", "Aligns incentives", "Improves token utility"],
+        ["Expands cross-chain presence", "Increases accessibility", "Diversifies ecosystem"]
+    ],
+    'recommendations': [
+        "Consider the long-term impact on governance participation",
+        "Evaluate the risk-reward profile of proposed changes",
+        "Assess the technical feasibility of implementation",
+        "Review the economic implications for token holders",
+        "Analyze the cross-chain integration requirements"
+    ]
+}
+
+class RiskAssessment(BaseModel):
+    """Risk assessment as returned by the model"""
+    risk_level: RiskLevel
+    risk_factors: List[str] = Field(default_factory=list)
+    risk_score: float = Field(ge=0.0, le=1.0)
+
+class ImpactScore(BaseModel):
+    """Impact on one aspect of the DAO"""
+    score: float = Field(ge=0.0, le=1.0)
+    description: str = ""
+
+_RISK_ADAPTER = TypeAdapter(RiskAssessment)
+_IMPACT_ADAPTER = TypeAdapter(Dict[str, ImpactScore])
+_KEY_POINTS_ADAPTER = TypeAdapter(List[str])
+
+def _parse_json(adapter: TypeAdapter) -> Callable[[str], Any]:
+    """Parser validating a JSON completion against a schema, returning plain JSON data"""
+    return lambda content: adapter.dump_python(adapter.validate_json(content), mode='json')
+
+def _validated(adapter: TypeAdapter, value: Any) -> Optional[Any]:
+    """Value validated against a schema as plain JSON data, or None when it does not fit"""
+    try:
+        return adapter.dump_python(adapter.validate_python(value), mode='json')
+    except ValidationError:
+        return None
+
+def _top_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first, equal values in input order"""
+    candidates = np.argpartition(-values, k - 1)[:k] if len(values) > k else np.arange(len(values))
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+def _split_lines(content: str) -> List[str]:
+    """Non-empty, stripped lines of a completion"""
+    return [line.strip() for line in content.split('\n') if line.strip()]
+
+@dataclass(frozen=True)
+class TextView:
+    """A proposal text truncated, counted and keyword-scanned once for all analyses"""
+    raw: str
+    excerpt: str
+    word_count: int
+    keywords: FrozenSet[str]
+
+    @classmethod
+    def of(cls, text: str) -> "TextView":
+        return cls(
+            raw=text,
+            excerpt=text[:PROMPT_CHARS],
+            word_count=len(text.split()),
+            keywords=frozenset(_KEYWORD_RE.findall(text.lower()))
+        )
+
+def _summary_messages(text: str) -> List[Dict[str, str]]:
+    """Chat messages for a standalone proposal summary"""
+    return [
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {"role": "user", "content": f"Summarize this proposal: {text[:1500]}"}
+    ]
+
+def _analysis_messages(view: TextView, dao_context: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Chat messages for the combined proposal analysis"""
+    context_info = f"DAO Treasury: ${dao_context.get('treasury_value', 0):,.0f}, Active Proposals: {dao_context.get('active_proposals', 0)}"
+    return [
+        {"role": "system", "content": PROPOSAL_ANALYSIS_PROMPT},
+        {"role": "user", "content": f"Analyze this proposal in context: {context_info}\n\nProposal: {view.excerpt}"}
+    ]
+
+def _openai_http_client():
+    """Long-lived pooled HTTP client for AsyncOpenAI"""
+    limits = httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                          max_keepalive_connections=OPENAI_MAX_CONNECTIONS)
+    try:
+        # httpx's connection pool degrades under many concurrent requests
+        return openai.DefaultAioHttpClient(limits=limits, timeout=OPENAI_TIMEOUT)
+    except (AttributeError, RuntimeError):
+        # Without the openai[aiohttp] extra, multiplex requests over one HTTP/2 connection
+        return openai.DefaultAsyncHttpxClient(http2=True, limits=limits, timeout=OPENAI_TIMEOUT)
+
+# One client (and connection pool) per API key, shared by every AIService
+_OPENAI_CLIENTS: Dict[str, openai.AsyncOpenAI] = {}
+
+def get_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    """Process-wide AsyncOpenAI client for the given API key"""
+    client = _OPENAI_CLIENTS.get(api_key)
+    if client is None:
+        client = openai.AsyncOpenAI(api_key=api_key, http_client=_openai_http_client())
+        _OPENAI_CLIENTS[api_key] = client
+    return client
+
+# Completion slots per event loop: on Python 3.9 a Semaphore is bound to the loop
+# it was created on, and fails when awaited under contention on any other
+_LLM_SEMAPHORES: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+def _llm_semaphore() -> asyncio.Semaphore:
+    """Completion slots shared by every AIService on the running loop, created on first use"""
+    loop = asyncio.get_running_loop()
+    semaphore = _LLM_SEMAPHORES.get(loop)
+    if semaphore is None:
+        # Forget loops that have closed since (asyncio.run calls, test runs)
+        for closed in [other for other in _LLM_SEMAPHORES if other.is_closed()]:
+            del _LLM_SEMAPHORES[closed]
+        semaphore = _LLM_SEMAPHORES[loop] = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+    return semaphore
+
+async def close_openai_clients():
+    """Close the shared OpenAI clients' HTTP connections"""
+    while _OPENAI_CLIENTS:
+        _, client = _OPENAI_CLIENTS.popitem()
+        await client.close()
+
 class AIService:
     def __init__(self):
         """Initialize AI service with OpenAI and ML models"""
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if self.openai_api_key:
             try:
-                self.openai_client = openai.OpenAI(api_key=self.openai_api_key)
+                self.openai_client = get_openai_client(self.openai_api_key)
                 self.openai_available = True
             except Exception as e:
                 logger.warning(f"OpenAI client initialization failed: {e}")
+                self.openai_client = None
                 self.openai_available = False
         else:
             logger.warning("OpenAI API key not found, using fallback models only")
+            self.openai_client = None
             self.openai_available = False
         
+        # Completion caches by prompt configuration, so similarity only compares like with like
+        self.llm_caches: Dict[str, SemanticCache] = {}
+        
         # Initialize ML models
-        self.proposal_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        # Small forest for a small training set. Trees are walked serially: predictions are
+        # single rows already run off the event loop, and every gunicorn worker loads its own copy
+        self.proposal_classifier = RandomForestClassifier(n_estimators=50, max_depth=8, random_state=42)
+        # Stateless: no vocabulary or IDF to fit, and safe to share across threads
+        self.vectorizer = HashingVectorizer(n_features=TEXT_FEATURES, alternate_sign=False,
+                                            stop_words='english', norm='l2')
+        # Memoized sparse text-feature rows for texts that are scored repeatedly
+        self._vectorize = lru_cache(maxsize=VECTORIZE_CACHE_SIZE)(self._transform_text)
         
         # Model training data (in production, this would come from database)
         self.training_data = self._load_training_data()
@@ -44,119 +319,303 @@ class AIService:
     
     def _load_training_data(self) -> pd.DataFrame:
         """Load training data for ML models"""
-        # Mock training data - in production this would come from historical DAO data
-        data = {
-            'proposal_text': [
-                "Increase treasury allocation to DeFi protocols",
-                "Reduce governance token supply",
-                "Add new validator to the network",
-                "Update smart contract parameters",
-                "Distribute rewards to token holders",
-                "Implement new security measures",
-                "Change voting mechanism",
-                "Allocate funds for development",
-                "Update tokenomics model",
-                "Implement cross-chain bridge"
-            ],
-            'proposer_reputation': [0.8, 0.6, 0.9, 0.7, 0.5, 0.8, 0.4, 0.7, 0.6, 0.8],
-            'proposal_complexity': [0.6, 0.8, 0.4, 0.7, 0.3, 0.9, 0.8, 0.5, 0.7, 0.6],
-            'community_sentiment': [0.7, 0.3, 0.8, 0.5, 0.9, 0.6, 0.2, 0.7, 0.4, 0.7],
-            'financial_impact': [0.8, 0.9, 0.3, 0.6, 0.7, 0.5, 0.8, 0.6, 0.8, 0.5],
-            'passed': [1, 0, 1, 0, 1, 1, 0, 1, 0, 1]
-        }
-        return pd.DataFrame(data)
+        return _TRAINING_DATA
     
     def _load_fallback_responses(self) -> Dict[str, Any]:
         """Load fallback responses for demo purposes when OpenAI is unavailable"""
-        return {
-            'summaries': [
-                "This proposal aims to improve the DAO's governance structure by implementing new voting mechanisms.",
-                "The proposal suggests reallocating treasury funds to optimize yield generation and risk management.",
-                "This governance proposal focuses on enhancing security measures and implementing new safety protocols.",
-                "The proposal recommends updating tokenomics to better align incentives and improve token utility.",
-                "This proposal suggests expanding the DAO's presence across multiple blockchain networks."
-            ],
-            'key_points': [
-                ["Improves governance efficiency", "Reduces voting complexity", "Enhances community participation"],
-                ["Optimizes treasury allocation", "Increases yield potential", "Reduces risk exposure"],
-                ["Enhances security protocols", "Implements new safety measures", "Protects user funds"],
-                ["Updates token distribution", "Aligns incentives", "Improves token utility"],
-                ["Expands cross-chain presence", "Increases accessibility", "Diversifies ecosystem"]
-            ],
-            'recommendations': [
-                "Consider the long-term impact on governance participation",
-                "Evaluate the risk-reward profile of proposed changes",
-                "Assess the technical feasibility of implementation",
-                "Review the economic implications for token holders",
-                "Analyze the cross-chain integration requirements"
-            ]
-        }
+        return _FALLBACK_RESPONSES
+    
+    def _model_path(self) -> str:
+        """Artifact path keyed on the training data and model configuration"""
+        digest = hashlib.sha256(pd.util.hash_pandas_object(self.training_data).values.tobytes())
+        digest.update(repr((self.vectorizer, self.proposal_classifier)).encode("utf-8"))
+        return os.path.join(MODEL_DIR, f"ai_{digest.hexdigest()[:16]}.joblib")
     
     def _train_models(self):
-        """Train ML models with historical data"""
+        """Load fitted ML models from disk, training and saving them when missing"""
         try:
-            # Prepare features
-            X_text = self.vectorizer.fit_transform(self.training_data['proposal_text'])
-            X_numeric = self.training_data[['proposer_reputation', 'proposal_complexity', 
-                                          'community_sentiment', 'financial_impact']].values
-            
-            # Combine features
-            X_combined = np.hstack([X_text.toarray(), X_numeric])
-            y = self.training_data['passed']
+            path = self._model_path()
+            models = _FITTED_MODELS.get(path)
+            if models is not None:
+                self.vectorizer, self.proposal_classifier = models
+            else:
+                try:
+                    # Read-only mmap lets worker processes share the loaded arrays
+                    vectorizer, classifier = joblib.load(path, mmap_mode='r')
+                    check_is_fitted(classifier)
+                    self.vectorizer, self.proposal_classifier = vectorizer, classifier
+                    logger.info("ML models loaded from disk")
+                except Exception as e:
+                    # Missing, truncated, or written by another sklearn/joblib version:
+                    # refit and replace the artifact rather than serve an unfitted model
+                    if not isinstance(e, FileNotFoundError):
+                        logger.warning(f"Discarding unusable ML model artifact {path}: {e}")
+                    self._fit_models()
+                    self._save_models(path)
+                _FITTED_MODELS[path] = (self.vectorizer, self.proposal_classifier)
             
-            # Train model
-            self.proposal_classifier.fit(X_combined, y)
-            logger.info("ML models trained successfully")
+            # Column of predict_proba holding the probability of passing
+            self._passed_column = int(np.flatnonzero(self.proposal_classifier.classes_ == 1)[0])
+            self._vectorize.cache_clear()
         except Exception as e:
             logger.error(f"Error training models: {e}")
     
+    def _fit_models(self):
+        """Train ML models with historical data"""
+        # Prepare features
+        X_text = self.vectorizer.transform(self.training_data['proposal_text'])
+        X_numeric = self.training_data[['proposer_reputation', 'proposal_complexity', 
+                                      'community_sentiment', 'financial_impact']].values
+        
+        # Combine features without densifying the text matrix
+        X_combined = sparse.hstack([X_text, sparse.csr_matrix(X_numeric)], format='csr')
+        y = self.training_data['passed']
+        
+        # Train model
+        self.proposal_classifier.fit(X_combined, y)
+        logger.info("ML models trained successfully")
+    
+    def _save_models(self, path: str):
+        """Persist fitted ML models for later startups and other workers"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so concurrently starting workers never read a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump((self.vectorizer, self.proposal_classifier), tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not save ML models: {e}")
+    
+    def _transform_text(self, text: str) -> sparse.csr_matrix:
+        """Hashed term-frequency row for a single text"""
+        return self.vectorizer.transform([text])
+    
     async def analyze_proposal(self, proposal_text: str, proposer_address: str, 
                              dao_context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Comprehensive proposal analysis using AI
         """
         try:
-            # Parallel processing for different analysis types
-            tasks = [
-                self._analyze_sentiment(proposal_text),
-                self._generate_summary(proposal_text),
-                self._assess_risk(proposal_text, dao_context),
-                self._predict_outcome(proposal_text, proposer_address, dao_context),
-                self._analyze_impact(proposal_text, dao_context)
-            ]
+            # Shared by every sub-analysis instead of each rescanning the text
+            view = TextView.of(proposal_text)
+            # The forest predicts in a worker thread (tree traversal releases the GIL)
+            # while the completion is awaited
+            fields, prediction = await asyncio.gather(
+                self._analyze_all(proposal_text, dao_context, view),
+                asyncio.to_thread(self._predict_outcome, proposal_text, proposer_address, dao_context, view)
+            )
+            return await self._proposal_result(fields, prediction, dao_context)
+        except Exception as e:
+            logger.error(f"Error in proposal analysis: {e}")
+            raise
+    
+    async def analyze_proposals_bulk(self, proposals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze many proposals through the OpenAI Batch API, for offline jobs.
+        
+        Each item holds analyze_proposal's arguments (proposal_text, proposer_address,
+        dao_context); results come back in the same order and shape. Completes once
+        the batch does, which can take up to BATCH_COMPLETION_WINDOW.
+        """
+        try:
+            views = [TextView.of(p['proposal_text']) for p in proposals]
+            contexts = [p.get('dao_context') or {} for p in proposals]
             
-            results = await asyncio.gather(*tasks)
+            completions: Dict[int, Dict[str, Any]] = {}
+            if self.openai_available:
+                try:
+                    completions = await self._batch_analyze(views, contexts)
+                except Exception as e:
+                    logger.error(f"Error in bulk proposal analysis with OpenAI: {e}")
             
-            return {
-                'sentiment_score': results[0],
-                'summary': results[1],
-                'risk_assessment': results[2],
-                'prediction': results[3],
-                'impact_analysis': results[4],
-                'confidence': self._calculate_confidence(results),
-                'key_points': await self._extract_key_points(proposal_text),
-                'recommendations': await self._generate_recommendations(results, dao_context)
-            }
+            predictions = await asyncio.to_thread(lambda: [
+                self._predict_outcome(view.raw, p.get('proposer_address', ''), ctx, view)
+                for p, view, ctx in zip(proposals, views, contexts)
+            ])
+            
+            return await asyncio.gather(*(
+                self._proposal_result(self._complete_fields(view, completions.get(i, {})), prediction, ctx)
+                for i, (view, ctx, prediction) in enumerate(zip(views, contexts, predictions))
+            ))
         except Exception as e:
-            logger.error(f"Error in proposal analysis: {e}")
+            logger.error(f"Error in bulk proposal analysis: {e}")
             raise
     
+    async def _batch_analyze(self, views: List[TextView],
+                             contexts: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Combined-analysis fields by proposal index, from the cache or one batch job"""
+        params = {"model": OPENAI_MODEL, **_ANALYSIS_PARAMS}
+        completions: Dict[int, Dict[str, Any]] = {}
+        pending: Dict[int, List[Dict[str, str]]] = {}
+        for i, (view, ctx) in enumerate(zip(views, contexts)):
+            messages = _analysis_messages(view, ctx)
+            cached = await self._llm_cache(messages, params).get(messages[-1]["content"])
+            if cached is not None:
+                completions[i] = orjson.loads(cached)
+            else:
+                pending[i] = messages
+        if not pending:
+            return completions
+        
+        requests = b"\n".join(
+            orjson.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"messages": messages, **params}
+            })
+            for i, messages in pending.items()
+        )
+        client = self.openai_client
+        upload = await client.files.create(file=("proposals.jsonl", requests), purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+        while batch.status not in _BATCH_DONE:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await client.batches.retrieve(batch.id)
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"OpenAI batch {batch.id} ended as {batch.status}")
+            return completions
+        
+        output = await client.files.content(batch.output_file_id)
+        for line in output.content.splitlines():
+            try:
+                record = orjson.loads(line)
+                i = int(record["custom_id"])
+                content = record["response"]["body"]["choices"][0]["message"]["content"]
+                fields = orjson.loads(content.strip())
+            except Exception as e:
+                logger.error(f"Unreadable line in OpenAI batch {batch.id} output: {e}")
+                continue
+            if i in pending:
+                completions[i] = fields
+                messages = pending[i]
+                await self._llm_cache(messages, params).set(messages[-1]["content"], orjson.dumps(fields).decode())
+        return completions
+    
+    async def _proposal_result(self, fields: Dict[str, Any], prediction: Dict[str, Any],
+                               dao_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble analyze_proposal's response from the analysis fields and prediction"""
+        results = [
+            fields['sentiment'],
+            fields['summary'],
+            fields['risk'],
+            prediction,
+            fields['impact']
+        ]
+        
+        return {
+            'sentiment_score': results[0],
+            'summary': results[1],
+            'risk_assessment': results[2],
+            'prediction': results[3],
+            'impact_analysis': results[4],
+            'confidence': self._calculate_confidence(results),
+            'key_points': fields['key_points'],
+            'recommendations': await self._generate_recommendations(results, dao_context)
+        }
+    
+    async def _analyze_all(self, text: str, dao_context: Dict[str, Any],
+                           view: Optional[TextView] = None) -> Dict[str, Any]:
+        """Sentiment, summary, risk, impact and key points from a single completion"""
+        if view is None:
+            view = TextView.of(text)
+        fields: Dict[str, Any] = {}
+        if self.openai_available:
+            try:
+                fields = await self._cached_completion(
+                    orjson.loads,
+                    messages=_analysis_messages(view, dao_context),
+                    **_ANALYSIS_PARAMS
+                )
+            except Exception as e:
+                logger.error(f"Error in proposal analysis with OpenAI: {e}")
+        return self._complete_fields(view, fields)
+    
+    def _complete_fields(self, view: TextView, fields: Any) -> Dict[str, Any]:
+        """Validate the combined-analysis fields, falling back for any that are unusable"""
+        text = view.raw
+        if not isinstance(fields, dict):
+            fields = {}
+        # Fall back per field, so one malformed field does not discard the rest
+        try:
+            sentiment = max(-1.0, min(1.0, float(fields['sentiment'])))
+        except (KeyError, TypeError, ValueError):
+            sentiment = self._get_fallback_sentiment(text, view)
+        
+        summary = fields.get('summary')
+        if not isinstance(summary, str) or not summary.strip():
+            summary = self._get_fallback_summary(text, view)
+        
+        risk = _validated(_RISK_ADAPTER, fields.get('risk'))
+        if risk is None:
+            risk = self._get_fallback_risk_assessment(text, view)
+        
+        impact = _validated(_IMPACT_ADAPTER, fields.get('impact'))
+        if not impact:
+            impact = self._get_fallback_impact_analysis(text, view)
+        
+        key_points = _validated(_KEY_POINTS_ADAPTER, fields.get('key_points'))
+        if not key_points:
+            key_points = self._get_fallback_key_points(text, view)
+        
+        return {
+            'sentiment': sentiment,
+            'summary': summary.strip(),
+            'risk': risk,
+            'impact': impact,
+            'key_points': key_points
+        }
+    
+    def _llm_cache(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> SemanticCache:
+        """Completion cache for one model, system prompt and parameter set"""
+        config = orjson.dumps([messages[:-1], params], option=orjson.OPT_SORT_KEYS).decode()
+        # Changing the prompt or parameters moves to a new namespace, also in Redis
+        namespace = f"llm:{content_digest(config)}"
+        cache = self.llm_caches.get(namespace)
+        if cache is None:
+            cache = SemanticCache(namespace, ttl=LLM_CACHE_TTL, threshold=LLM_CACHE_THRESHOLD,
+                                  max_entries=LLM_CACHE_SIZE)
+            self.llm_caches[namespace] = cache
+        return cache
+    
+    async def _cached_completion(self, parse: Callable[[str], Any],
+                                 messages: List[Dict[str, str]], **params) -> Any:
+        """Run a chat completion, reusing the parsed result for near-duplicate prompts"""
+        params.setdefault("model", OPENAI_MODEL)
+        cache = self._llm_cache(messages, params)
+        # Everything but the user message is fixed per cache, so it is the key
+        key = messages[-1]["content"]
+        cached = await cache.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+        
+        async with _llm_semaphore():
+            response = await self.openai_client.chat.completions.create(
+                messages=messages,
+                **params
+            )
+        result = parse(response.choices[0].message.content.strip())
+        await cache.set(key, orjson.dumps(result).decode())
+        return result
+    
     async def _analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment of proposal text"""
         if self.openai_available:
             try:
-                response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model="gpt-3.5-turbo",
+                score = await self._cached_completion(
+                    float,
                     messages=[
-                        {"role": "system", "content": "You are a sentiment analysis expert. Analyze the sentiment of the given DAO proposal text and return a score between -1 (very negative) and 1 (very positive). Return only the numeric score."},
+                        {"role": "system", "content": SENTIMENT_PROMPT},
                         {"role": "user", "content": f"Analyze the sentiment of this proposal: {text[:1000]}"}
                     ],
                     max_tokens=10,
                     temperature=0.1
                 )
                 
-                score = float(response.choices[0].message.content.strip())
                 return max(-1.0, min(1.0, score))  # Clamp between -1 and 1
             except Exception as e:
                 logger.error(f"Error in sentiment analysis with OpenAI: {e}")
@@ -164,59 +623,102 @@ class AIService:
         else:
             return self._get_fallback_sentiment(text)
     
-    def _get_fallback_sentiment(self, text: str) -> float:
+    def _get_fallback_sentiment(self, text: str, view: Optional[TextView] = None) -> float:
         """Get fallback sentiment score for demo purposes"""
-        import random
         # Simple keyword-based sentiment analysis
-        text_lower = text.lower()
-        positive_words = ['improve', 'enhance', 'optimize', 'increase', 'benefit', 'positive']
-        negative_words = ['reduce', 'decrease', 'risk', 'danger', 'negative', 'problem']
-        
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        if view is None:
+            view = TextView.of(text)
+        positive_count = len(view.keywords & _POSITIVE_WORDS)
+        negative_count = len(view.keywords & _NEGATIVE_WORDS)
         
         if positive_count > negative_count:
-            return random.uniform(0.3, 0.8)
+            return _RNG.uniform(0.3, 0.8)
         elif negative_count > positive_count:
-            return random.uniform(-0.8, -0.3)
+            return _RNG.uniform(-0.8, -0.3)
         else:
-            return random.uniform(-0.2, 0.2)
+            return _RNG.uniform(-0.2, 0.2)
     
     async def _generate_summary(self, text: str) -> str:
         """Generate concise summary of proposal"""
         if self.openai_available:
             try:
-                response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are an expert at summarizing DAO governance proposals. Create a clear, concise summary in 2-3 sentences that captures the key points and intent."},
-                        {"role": "user", "content": f"Summarize this proposal: {text[:1500]}"}
-                ],
-                max_tokens=150,
-                temperature=0.3
-            )
-            
-                return response.choices[0].message.content.strip()
+                return await self._cached_completion(str, messages=_summary_messages(text), **_SUMMARY_PARAMS)
             except Exception as e:
                 logger.error(f"Error generating summary with OpenAI: {e}")
                 return self._get_fallback_summary(text)
         else:
             return self._get_fallback_summary(text)
     
-    def _get_fallback_summary(self, text: str) -> str:
+    async def stream_summary(self, text: str) -> AsyncIterator[str]:
+        """Yield the proposal summary as it is generated, for progressive display"""
+        if not self.openai_available:
+            yield self._get_fallback_summary(text)
+            return
+        
+        messages = _summary_messages(text)
+        params = {"model": OPENAI_MODEL, **_SUMMARY_PARAMS}
+        cache = self._llm_cache(messages, params)
+        key = messages[-1]["content"]
+        cached = await cache.get(key)
+        if cached is not None:
+            yield orjson.loads(cached)
+            return
+        
+        # The completion is read into a queue by its own task, so the completion slot is
+        # released as soon as OpenAI finishes rather than when a slow client has read it all
+        deltas: asyncio.Queue = asyncio.Queue()
+        
+        async def read_completion():
+            try:
+                async with _llm_semaphore():
+                    stream = await self.openai_client.chat.completions.create(
+                        messages=messages,
+                        stream=True,
+                        **params
+                    )
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            deltas.put_nowait(delta)
+            finally:
+                deltas.put_nowait(None)
+        
+        reader = asyncio.create_task(read_completion())
+        parts: List[str] = []
+        try:
+            while True:
+                delta = await deltas.get()
+                if delta is None:
+                    break
+                parts.append(delta)
+                yield delta
+            await reader
+        except Exception as e:
+            logger.error(f"Error streaming summary with OpenAI: {e}")
+            if not parts:
+                yield self._get_fallback_summary(text)
+            return
+        finally:
+            # A no-op once the completion is read; stops it if the client went away
+            reader.cancel()
+        
+        summary = "".join(parts).strip()
+        if summary:
+            await cache.set(key, orjson.dumps(summary).decode())
+    
+    def _get_fallback_summary(self, text: str, view: Optional[TextView] = None) -> str:
         """Get fallback summary for demo purposes"""
-        import random
         # Simple keyword-based summary generation
-        text_lower = text.lower()
-        if any(word in text_lower for word in ['treasury', 'fund', 'allocation']):
+        if view is None:
+            view = TextView.of(text)
+        if view.keywords & _TREASURY_WORDS:
             return "This proposal focuses on treasury management and fund allocation strategies."
-        elif any(word in text_lower for word in ['governance', 'voting', 'proposal']):
+        elif view.keywords & _GOVERNANCE_PROPOSAL_WORDS:
             return "This proposal aims to improve governance mechanisms and voting processes."
-        elif any(word in text_lower for word in ['security', 'safety', 'protection']):
+        elif view.keywords & _SECURITY_WORDS:
             return "This proposal enhances security measures and safety protocols."
         else:
-            return random.choice(self.fallback_responses['summaries'])
+            return _RNG.choice(self.fallback_responses['summaries'])
     
     async def _assess_risk(self, text: str, dao_context: Dict[str, Any]) -> Dict[str, Any]:
         """Assess risk level and factors"""
@@ -224,18 +726,17 @@ class AIService:
             try:
                 context_info = f"DAO Treasury: ${dao_context.get('treasury_value', 0):,.0f}, Active Proposals: {dao_context.get('active_proposals', 0)}"
                 
-                response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model="gpt-3.5-turbo",
+                result = await self._cached_completion(
+                    _parse_json(_RISK_ADAPTER),
                     messages=[
-                        {"role": "system", "content": "You are a risk assessment expert for DAO governance. Analyze the risk level (low/medium/high) and identify specific risk factors. Return JSON format: {\"risk_level\": \"low/medium/high\", \"risk_factors\": [\"factor1\", \"factor2\"], \"risk_score\": 0.0-1.0}"},
+                        {"role": "system", "content": RISK_PROMPT},
                         {"role": "user", "content": f"Assess risk for this proposal in context: {context_info}\n\nProposal: {text[:1000]}"}
                     ],
                     max_tokens=200,
-                    temperature=0.2
+                    temperature=0.2,
+                    response_format={"type": "json_object"}
                 )
                 
-                result = json.loads(response.choices[0].message.content.strip())
                 return result
             except Exception as e:
                 logger.error(f"Error in risk assessment with OpenAI: {e}")
@@ -243,20 +744,20 @@ class AIService:
         else:
             return self._get_fallback_risk_assessment(text)
     
-    def _get_fallback_risk_assessment(self, text: str) -> Dict[str, Any]:
+    def _get_fallback_risk_assessment(self, text: str, view: Optional[TextView] = None) -> Dict[str, Any]:
         """Get fallback risk assessment for demo purposes"""
-        import random
         # Simple keyword-based risk assessment
-        text_lower = text.lower()
+        if view is None:
+            view = TextView.of(text)
         
-        if any(word in text_lower for word in ['fund', 'money', 'treasury', 'allocation']):
-            risk_level = random.choice(['medium', 'high'])
+        if view.keywords & _FINANCIAL_WORDS:
+            risk_level = _RNG.choice(('medium', 'high'))
             risk_factors = ["Financial impact", "Treasury exposure", "Market volatility"]
-        elif any(word in text_lower for word in ['security', 'safety', 'protection']):
-            risk_level = random.choice(['low', 'medium'])
+        elif view.keywords & _SECURITY_WORDS:
+            risk_level = _RNG.choice(('low', 'medium'))
             risk_factors = ["Implementation complexity", "Security considerations"]
         else:
-            risk_level = random.choice(['low', 'medium'])
+            risk_level = _RNG.choice(('low', 'medium'))
             risk_factors = ["Standard governance risk", "Community impact"]
         
         risk_score = {"low": 0.2, "medium": 0.5, "high": 0.8}[risk_level]
@@ -267,30 +768,34 @@ class AIService:
             "risk_score": risk_score
         }
     
-    def _predict_outcome(self, text: str, proposer_address: str, dao_context: Dict[str, Any]) -> Dict[str, float]:
+    def _predict_outcome(self, text: str, proposer_address: str, dao_context: Dict[str, Any],
+                         view: Optional[TextView] = None) -> Dict[str, float]:
         """Predict proposal outcome using ML model"""
         try:
+            if view is None:
+                view = TextView.of(text)
+            
             # Extract features
-            text_features = self.vectorizer.transform([text]).toarray()
+            text_features = self._vectorize(text)
             
             # Mock features (in production, these would be calculated from real data)
             proposer_reputation = dao_context.get('proposer_reputation', 0.5)
-            complexity = len(text.split()) / 100  # Simple complexity metric
+            complexity = view.word_count / 100  # Simple complexity metric
             sentiment = dao_context.get('avg_sentiment', 0.0)
             financial_impact = dao_context.get('financial_impact_score', 0.5)
             
             numeric_features = np.array([[proposer_reputation, complexity, sentiment, financial_impact]])
             
-            # Combine features
-            features = np.hstack([text_features, numeric_features])
+            # Combine features, keeping the text row sparse
+            features = sparse.hstack([text_features, sparse.csr_matrix(numeric_features)], format='csr')
             
             # Make prediction
-            prediction = self.proposal_classifier.predict_proba(features)[0][1]
-            confidence = self.proposal_classifier.predict_proba(features).max()
+            # One pass over the forest yields both the prediction and its confidence
+            probs = self.proposal_classifier.predict_proba(features)[0]
             
             return {
-                'prediction': float(prediction),
-                'confidence': float(confidence)
+                'prediction': float(probs[self._passed_column]),
+                'confidence': float(probs.max())
             }
         except Exception as e:
             logger.error(f"Error in outcome prediction: {e}")
@@ -300,42 +805,40 @@ class AIService:
         """Analyze potential impact of proposal"""
         if self.openai_available:
             try:
-                response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model="gpt-3.5-turbo",
+                return await self._cached_completion(
+                    _parse_json(_IMPACT_ADAPTER),
                     messages=[
-                        {"role": "system", "content": "You are an expert at analyzing DAO governance proposal impacts. Analyze the potential impact on treasury, governance, community, and technical aspects. Return JSON format with impact scores (0-1) and descriptions."},
+                        {"role": "system", "content": IMPACT_PROMPT},
                         {"role": "user", "content": f"Analyze impact of this proposal: {text[:1000]}"}
                     ],
                     max_tokens=300,
-                    temperature=0.3
+                    temperature=0.3,
+                    response_format={"type": "json_object"}
                 )
-                
-                return json.loads(response.choices[0].message.content.strip())
             except Exception as e:
                 logger.error(f"Error in impact analysis with OpenAI: {e}")
                 return self._get_fallback_impact_analysis(text)
         else:
             return self._get_fallback_impact_analysis(text)
     
-    def _get_fallback_impact_analysis(self, text: str) -> Dict[str, Any]:
+    def _get_fallback_impact_analysis(self, text: str, view: Optional[TextView] = None) -> Dict[str, Any]:
         """Get fallback impact analysis for demo purposes"""
-        import random
         # Simple keyword-based impact analysis
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['treasury', 'fund', 'money']):
-            treasury_score = random.uniform(0.6, 0.9)
-            governance_score = random.uniform(0.3, 0.6)
-            community_score = random.uniform(0.4, 0.7)
-        elif any(word in text_lower for word in ['governance', 'voting']):
-            treasury_score = random.uniform(0.2, 0.5)
-            governance_score = random.uniform(0.7, 0.9)
-            community_score = random.uniform(0.6, 0.8)
+        if view is None:
+            view = TextView.of(text)
+        
+        if view.keywords & _FUNDING_WORDS:
+            treasury_score = _RNG.uniform(0.6, 0.9)
+            governance_score = _RNG.uniform(0.3, 0.6)
+            community_score = _RNG.uniform(0.4, 0.7)
+        elif view.keywords & _GOVERNANCE_WORDS:
+            treasury_score = _RNG.uniform(0.2, 0.5)
+            governance_score = _RNG.uniform(0.7, 0.9)
+            community_score = _RNG.uniform(0.6, 0.8)
         else:
-            treasury_score = random.uniform(0.3, 0.6)
-            governance_score = random.uniform(0.4, 0.7)
-            community_score = random.uniform(0.5, 0.8)
+            treasury_score = _RNG.uniform(0.3, 0.6)
+            governance_score = _RNG.uniform(0.4, 0.7)
+            community_score = _RNG.uniform(0.5, 0.8)
         
         return {
             "treasury_impact": {"score": treasury_score, "description": "Moderate treasury impact"},
@@ -347,35 +850,32 @@ class AIService:
         """Extract key points from proposal"""
         if self.openai_available:
             try:
-                response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model="gpt-3.5-turbo",
+                return await self._cached_completion(
+                    _parse_json(_KEY_POINTS_ADAPTER),
                     messages=[
-                        {"role": "system", "content": "Extract 3-5 key points from this DAO proposal. Return as a JSON array of strings."},
+                        {"role": "system", "content": KEY_POINTS_PROMPT},
                         {"role": "user", "content": f"Extract key points: {text[:1000]}"}
                     ],
                     max_tokens=200,
                     temperature=0.2
                 )
-                
-                return json.loads(response.choices[0].message.content.strip())
             except Exception as e:
                 logger.error(f"Error extracting key points with OpenAI: {e}")
                 return self._get_fallback_key_points(text)
         else:
             return self._get_fallback_key_points(text)
     
-    def _get_fallback_key_points(self, text: str) -> List[str]:
+    def _get_fallback_key_points(self, text: str, view: Optional[TextView] = None) -> List[str]:
         """Get fallback key points for demo purposes"""
-        import random
         # Simple keyword-based key point extraction
-        text_lower = text.lower()
+        if view is None:
+            view = TextView.of(text)
         
-        if any(word in text_lower for word in ['treasury', 'fund', 'allocation']):
-            return random.choice(self.fallback_responses['key_points'])
-        elif any(word in text_lower for word in ['governance', 'voting']):
+        if view.keywords & _TREASURY_WORDS:
+            return _RNG.choice(self.fallback_responses['key_points'])
+        elif view.keywords & _GOVERNANCE_WORDS:
             return ["Improves governance efficiency", "Enhances voting mechanisms", "Increases community participation"]
-        elif any(word in text_lower for word in ['security', 'safety']):
+        elif view.keywords & _SAFETY_WORDS:
             return ["Enhances security protocols", "Implements safety measures", "Protects user assets"]
         else:
             return ["Proposal analysis completed", "Key objectives identified", "Impact assessment provided"]
@@ -386,19 +886,15 @@ class AIService:
             try:
                 context = f"Sentiment: {analysis_results[0]}, Risk: {analysis_results[2]}, Prediction: {analysis_results[3]}"
                 
-                response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model="gpt-3.5-turbo",
+                return await self._cached_completion(
+                    _split_lines,
                     messages=[
-                        {"role": "system", "content": "Based on the analysis results, provide 2-3 actionable recommendations for DAO members. Focus on voting guidance and risk mitigation."},
+                        {"role": "system", "content": RECOMMENDATIONS_PROMPT},
                         {"role": "user", "content": f"Generate recommendations based on: {context}"}
-                ],
-                max_tokens=150,
-                temperature=0.3
-            )
-            
-                recommendations = response.choices[0].message.content.strip().split('\n')
-                return [rec.strip() for rec in recommendations if rec.strip()]
+                    ],
+                    max_tokens=150,
+                    temperature=0.3
+                )
             except Exception as e:
                 logger.error(f"Error generating recommendations with OpenAI: {e}")
                 return self._get_fallback_recommendations(analysis_results)
@@ -407,7 +903,6 @@ class AIService:
     
     def _get_fallback_recommendations(self, analysis_results: List) -> List[str]:
         """Get fallback recommendations for demo purposes"""
-        import random
         # Simple logic-based recommendations
         sentiment = analysis_results[0] if len(analysis_results) > 0 else 0
         risk_assessment = analysis_results[2] if len(analysis_results) > 2 else {}
@@ -426,7 +921,7 @@ class AIService:
         elif risk_assessment.get('risk_level') == 'low':
             recommendations.append("Low risk proposal - standard review recommended")
         
-        recommendations.append(random.choice(self.fallback_responses['recommendations']))
+        recommendations.append(_RNG.choice(self.fallback_responses['recommendations']))
         
         return recommendations
     
@@ -446,25 +941,37 @@ class AIService:
             return 0.5
     
     async def analyze_treasury_health(self, treasury_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze treasury health and provide recommendations"""
+        """
+        Analyze treasury health and provide recommendations
+        
+        Assets are given either as an 'assets' list of {'symbol', 'value_usd'} dicts or as
+        parallel 'symbols' and 'values_usd' arrays.
+        """
         try:
-            # Calculate diversification score
+            # Values and symbol ids per asset; risk and liquidity are gathered from the profile matrix
             assets = treasury_data.get('assets', [])
-            total_value = sum(asset.get('value_usd', 0) for asset in assets)
+            if 'values_usd' in treasury_data:
+                symbols = treasury_data.get('symbols', ())
+                values = np.asarray(treasury_data['values_usd'], dtype=np.float64)
+            else:
+                symbols = [asset.get('symbol') for asset in assets]
+                values = np.fromiter((asset.get('value_usd', 0) for asset in assets), dtype=np.float64, count=len(assets))
+            ids = np.fromiter((_SYMBOL_TO_ID.get(symbol, _UNKNOWN_ID) for symbol in symbols),
+                              dtype=np.intp, count=len(symbols))
+            profiles = _PROFILE_MATRIX[ids]
+            total_value = values.sum()
             
             if total_value == 0:
                 return {"error": "No treasury data available"}
             
+            weights = values / total_value
+            
             # Calculate diversification (Herfindahl-Hirschman Index)
-            concentrations = [(asset.get('value_usd', 0) / total_value) ** 2 for asset in assets]
-            hhi = sum(concentrations)
+            hhi = float(weights @ weights)
             diversification_score = 1 - hhi  # Higher is better
             
-            # Calculate risk score based on asset volatility
-            risk_score = self._calculate_treasury_risk(assets)
-            
-            # Calculate liquidity score
-            liquidity_score = self._calculate_liquidity_score(assets)
+            # Calculate risk (asset volatility) and liquidity scores together
+            risk_score, liquidity_score = self._calculate_risk_and_liquidity(weights, profiles)
             
             # Generate AI recommendations
             recommendations = await self._generate_treasury_recommendations(
@@ -476,63 +983,24 @@ class AIService:
                 'risk_score': risk_score,
                 'liquidity_score': liquidity_score,
                 'recommendations': recommendations,
-                'top_holdings': sorted(assets, key=lambda x: x.get('value_usd', 0), reverse=True)[:5]
+                'top_holdings': [
+                    assets[i] if assets else
+                    {'symbol': symbols[i], 'value_usd': float(values[i]), 'percentage': float(weights[i])}
+                    for i in _top_indices(values, TOP_HOLDINGS)
+                ]
             }
         except Exception as e:
             logger.error(f"Error in treasury analysis: {e}")
             raise
     
-    def _calculate_treasury_risk(self, assets: List[Dict[str, Any]]) -> float:
-        """Calculate treasury risk score"""
+    def _calculate_risk_and_liquidity(self, weights: np.ndarray, profiles: np.ndarray) -> Tuple[float, float]:
+        """Value-weighted treasury risk and liquidity scores"""
         try:
-            # Mock risk calculation (in production, would use real volatility data)
-            risk_scores = {
-                'USDC': 0.1, 'USDT': 0.1, 'DAI': 0.1,  # Stablecoins
-                'ETH': 0.6, 'BTC': 0.7,  # Major cryptos
-                'UNI': 0.8, 'AAVE': 0.8, 'COMP': 0.8  # DeFi tokens
-            }
-            
-            total_value = sum(asset.get('value_usd', 0) for asset in assets)
-            if total_value == 0:
-                return 0.5
-            
-            weighted_risk = 0
-            for asset in assets:
-                symbol = asset.get('symbol', 'UNKNOWN')
-                value = asset.get('value_usd', 0)
-                risk = risk_scores.get(symbol, 0.5)
-                weighted_risk += (value / total_value) * risk
-            
-            return min(1.0, weighted_risk)
+            risk, liquidity = np.minimum(1.0, weights @ profiles)
+            return float(risk), float(liquidity)
         except Exception as e:
-            logger.error(f"Error calculating treasury risk: {e}")
-            return 0.5
-    
-    def _calculate_liquidity_score(self, assets: List[Dict[str, Any]]) -> float:
-        """Calculate liquidity score"""
-        try:
-            # Mock liquidity calculation
-            liquidity_scores = {
-                'USDC': 1.0, 'USDT': 1.0, 'DAI': 1.0,  # High liquidity
-                'ETH': 0.9, 'BTC': 0.9,  # High liquidity
-                'UNI': 0.7, 'AAVE': 0.6, 'COMP': 0.6  # Medium liquidity
-            }
-            
-            total_value = sum(asset.get('value_usd', 0) for asset in assets)
-            if total_value == 0:
-                return 0.5
-            
-            weighted_liquidity = 0
-            for asset in assets:
-                symbol = asset.get('symbol', 'UNKNOWN')
-                value = asset.get('value_usd', 0)
-                liquidity = liquidity_scores.get(symbol, 0.5)
-                weighted_liquidity += (value / total_value) * liquidity
-            
-            return min(1.0, weighted_liquidity)
-        except Exception as e:
-            logger.error(f"Error calculating liquidity score: {e}")
-            return 0.5
+            logger.error(f"Error calculating treasury risk and liquidity: {e}")
+            return 0.5, 0.5
     
     async def _generate_treasury_recommendations(self, diversification: float, risk: float, 
                                                liquidity: float, assets: List[Dict[str, Any]]) -> List[str]:
@@ -551,4 +1019,10 @@ class AIService:
         if not recommendations:
             recommendations.append("Treasury appears well-balanced - maintain current allocation strategy")
         
-        return recommendations 
\ No newline at end of file
+        return recommendations 
+
+
+@lru_cache(maxsize=1)
+def get_ai_service() -> AIService:
+    """Process-wide AIService, so its models and completion caches are loaded once and shared"""
+    return AIService()
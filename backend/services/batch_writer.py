@@ -0,0 +1,96 @@
+"""
+Asynchronous batching for background database writes.
+
+Requests enqueue records without waiting; consumer tasks (one by default) drain
+the queue and hand up to ``max_batch`` records to ``flush`` at once, waiting at
+most ``linger`` seconds for a batch to fill. One transaction per batch replaces
+one transaction per request.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+class BatchWriter(Generic[T]):
+    """
+    Queue-backed writer that flushes records in batches
+    """
+
+    def __init__(self, flush: Callable[[List[T]], Awaitable[None]], name: str = "batch-writer",
+                 max_batch: int = 64, linger: float = 0.05, workers: int = 1, maxsize: int = 0):
+        self.flush = flush
+        self.name = name
+        self.max_batch = max_batch
+        self.linger = linger
+        # Concurrent consumers, so a slow flush does not hold up the next batch
+        self.workers = workers
+        # Queue bound (0 = unbounded); a full queue makes put() wait for the consumers
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the consumer tasks on the running loop"""
+        if not self._tasks:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._tasks = [asyncio.create_task(self._run(), name=self.name)
+                           for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Flush whatever is queued and stop the consumers"""
+        if not self._tasks:
+            return
+        # Each consumer exits on the first stop marker it takes
+        for _ in self._tasks:
+            await self._queue.put(_STOP)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+        # Records put while the consumers were stopping sit behind the stop markers
+        leftover = []
+        while not self._queue.empty():
+            record = self._queue.get_nowait()
+            if record is not _STOP:
+                leftover.append(record)
+        for start in range(0, len(leftover), self.max_batch):
+            await self._flush(leftover[start:start + self.max_batch])
+
+    async def put(self, record: T) -> None:
+        """Enqueue a record; written directly when the consumers are not running"""
+        if not self._tasks:
+            await self._flush([record])
+            return
+        await self._queue.put(record)
+
+    async def _collect(self, batch: List[T]) -> bool:
+        while len(batch) < self.max_batch:
+            record = await self._queue.get()
+            if record is _STOP:
+                return False
+            batch.append(record)
+        return True
+
+    async def _run(self) -> None:
+        running = True
+        while running:
+            record = await self._queue.get()
+            if record is _STOP:
+                return
+            batch = [record]
+            try:
+                running = await asyncio.wait_for(self._collect(batch), timeout=self.linger)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[T]) -> None:
+        try:
+            await self.flush(batch)
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} records in {self.name}: {e}")
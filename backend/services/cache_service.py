@@ -0,0 +1,268 @@
+"""
+Caching for expensive AI analyses and polled responses.
+
+Exact repeats are looked up by a content hash, in Redis when ``REDIS_URL`` is
+configured and in process otherwise. Near-duplicate texts are matched by cosine
+similarity of hashed bag-of-words embeddings held in process, so a lookup never
+costs an extra network round-trip to an embedding API. A near-duplicate must also
+carry exactly the same numbers and hex ids (amounts, addresses), which barely
+move the similarity but change what the text means.
+
+``ResponseCache`` keeps short-lived response models in process (L1) and in
+Redis (L2), and collapses concurrent misses for the same key into one load.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+from pydantic import BaseModel
+from sklearn.feature_extraction.text import HashingVectorizer
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; the in-process store is used instead
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1024
+
+# Single-character tokens are kept, so "5" and "9" or options "a" and "b" differ
+_embedder = HashingVectorizer(n_features=EMBEDDING_DIM, alternate_sign=False, norm="l2",
+                              token_pattern=r"(?u)\b\w+\b")
+
+# Numbers and hex ids; near-duplicates must agree on all of them
+_LITERAL_RE = re.compile(r"0x[0-9a-f]+|\d+(?:[.,]\d+)*")
+
+
+def _redis_client(redis_url: Optional[str]):
+    """Redis client for the given or configured URL, or None when unavailable"""
+    redis_url = redis_url or os.getenv("REDIS_URL")
+    if redis_url and aioredis is not None:
+        return aioredis.from_url(redis_url)
+    return None
+
+
+def content_digest(text: str) -> str:
+    """Stable hash of a cache key text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def embed(text: str) -> np.ndarray:
+    """L2-normalised hashed bag-of-words vector for similarity lookups"""
+    return _embedder.transform([text]).toarray()[0].astype(np.float32)
+
+
+def literals_key(text: str) -> int:
+    """Hash of the set of numbers and hex ids in a text"""
+    return hash(frozenset(_LITERAL_RE.findall(text.lower())))
+
+
+class SemanticCache:
+    """
+    Exact + near-duplicate cache for serialized analysis results
+    """
+
+    def __init__(self, namespace: str, ttl: int = 3600, threshold: float = 0.9,
+                 max_entries: int = 1024, redis_url: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self._redis = _redis_client(redis_url)
+
+        # In-process payload store used when Redis is not configured
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+        # Ring buffer of embeddings for the similarity lookup
+        self._vectors = np.zeros((max_entries, EMBEDDING_DIM), dtype=np.float32)
+        self._digests: List[Optional[str]] = [None] * max_entries
+        self._literal_keys = np.zeros(max_entries, dtype=np.int64)
+        self._next_slot = 0
+
+        # Tag (e.g. proposal_id) -> digest of the entry stored under it
+        self._tags: Dict[str, str] = {}
+
+    def _key(self, digest: str) -> str:
+        return f"{self.namespace}:exact:{digest}"
+
+    async def _get_payload(self, digest: str) -> Optional[str]:
+        if self._redis is not None:
+            try:
+                payload = await self._redis.get(self._key(digest))
+                return payload.decode("utf-8") if payload is not None else None
+            except Exception as e:
+                logger.warning(f"Redis cache read failed: {e}")
+                return None
+
+        entry = self._local.get(digest)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.monotonic():
+            del self._local[digest]
+            return None
+        self._local.move_to_end(digest)
+        return payload
+
+    async def _set_payload(self, digest: str, payload: str) -> None:
+        if self._redis is not None:
+            try:
+                await self._redis.set(self._key(digest), payload, ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis cache write failed: {e}")
+            return
+
+        self._local[digest] = (time.monotonic() + self.ttl, payload)
+        self._local.move_to_end(digest)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def delete(self, digest: str) -> None:
+        """Drop an entry from the exact store and the similarity index"""
+        if self._redis is not None:
+            try:
+                await self._redis.delete(self._key(digest))
+            except Exception as e:
+                logger.warning(f"Redis cache delete failed: {e}")
+        else:
+            self._local.pop(digest, None)
+
+        for slot, stored in enumerate(self._digests):
+            if stored == digest:
+                self._digests[slot] = None
+                self._vectors[slot] = 0.0
+
+    def _nearest(self, vector: np.ndarray, literal_key: int) -> Tuple[Optional[str], float]:
+        # Only entries with the same numbers and ids are candidates
+        scores = np.where(self._literal_keys == literal_key, self._vectors @ vector, -1.0)
+        slot = int(np.argmax(scores))
+        return self._digests[slot], float(scores[slot])
+
+    async def get(self, text: str) -> Optional[str]:
+        """Return the cached payload for an exact or near-duplicate text"""
+        digest = content_digest(text)
+        payload = await self._get_payload(digest)
+        if payload is not None:
+            return payload
+
+        nearest, score = self._nearest(embed(text), literals_key(text))
+        if nearest is not None and score >= self.threshold:
+            return await self._get_payload(nearest)
+        return None
+
+    async def set(self, text: str, payload: str, tag: Optional[str] = None) -> None:
+        """Cache a payload; a new entry under an existing tag replaces the old one"""
+        digest = content_digest(text)
+        if tag is not None:
+            previous = self._tags.get(tag)
+            if previous is not None and previous != digest:
+                await self.delete(previous)
+            self._tags[tag] = digest
+
+        await self._set_payload(digest, payload)
+
+        slot = self._next_slot
+        self._vectors[slot] = embed(text)
+        self._digests[slot] = digest
+        self._literal_keys[slot] = literals_key(text)
+        self._next_slot = (slot + 1) % self.max_entries
+
+
+class ResponseCache:
+    """
+    Short-TTL cache for polled responses with single-flight loading
+    """
+
+    def __init__(self, namespace: str = "resp", ttl: int = 30, max_entries: int = 2048,
+                 redis_url: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._redis = _redis_client(redis_url)
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Loads in progress; invalidation drops a key's entry so its result is not stored
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _lookup(self, key: str, model: Optional[Type[BaseModel]]) -> Optional[Any]:
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at >= time.monotonic():
+                self._local.move_to_end(key)
+                return value
+            del self._local[key]
+
+        if self._redis is not None and model is not None:
+            try:
+                payload = await self._redis.get(self._key(key))
+            except Exception as e:
+                logger.warning(f"Redis cache read failed: {e}")
+                return None
+            if payload is not None:
+                value = model.model_validate_json(payload)
+                self._store_local(key, value)
+                return value
+        return None
+
+    def _store_local(self, key: str, value: Any) -> None:
+        self._local[key] = (time.monotonic() + self.ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                    model: Optional[Type[BaseModel]]) -> Any:
+        value = await loader()
+        if self._inflight.get(key) is not asyncio.current_task():
+            # Invalidated while loading: the value may predate the change
+            return value
+
+        self._store_local(key, value)
+        if self._redis is not None and isinstance(value, BaseModel):
+            try:
+                await self._redis.set(self._key(key), value.model_dump_json(), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis cache write failed: {e}")
+        return value
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          model: Optional[Type[BaseModel]] = None) -> Any:
+        """Return the cached value for key, loading it once for all concurrent callers"""
+        value = await self._lookup(key, model)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, model))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # A cancelled caller must not cancel the load other callers are waiting on
+        return await asyncio.shield(task)
+
+    async def invalidate(self, *keys: str) -> None:
+        """Drop cached values so the next request reloads them"""
+        for key in keys:
+            self._local.pop(key, None)
+            self._inflight.pop(key, None)
+
+        if self._redis is not None and keys:
+            try:
+                await self._redis.delete(*(self._key(key) for key in keys))
+            except Exception as e:
+                logger.warning(f"Redis cache delete failed: {e}")
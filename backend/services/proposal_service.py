@@ -2,25 +2,41 @@ import asyncio
 import json
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from sqlalchemy import delete, insert
+
+from models.database import Proposal, ProposalAnalysis, SessionLocal
+from models.repository import bulk_upsert, ensure_daos, get_analyzed_proposals
 from models.schemas import (
     ProposalAnalysisRequest, 
     ProposalAnalysisResponse, 
     ProposalSummaryResponse,
+    ProposalStatus,
     RiskLevel
 )
-from services.ai_service import AIService
-from services.dao_service import DAOService
+from services.ai_service import get_ai_service
+from services.batch_writer import BatchWriter
+from services.cache_service import SemanticCache
+from services.dao_service import get_dao_service
 
 logger = logging.getLogger(__name__)
 
+# A submitted proposal and the analysis returned for it, stored together
+AnalyzedProposal = Tuple[ProposalAnalysisRequest, ProposalAnalysisResponse]
+
 class ProposalService:
     def __init__(self):
         """Initialize proposal service"""
-        self.ai_service = AIService()
-        self.dao_service = DAOService()
+        self.ai_service = get_ai_service()
+        self.dao_service = get_dao_service()
+        
+        # Re-submitted or near-identical proposals reuse the previous analysis
+        self.analysis_cache = SemanticCache("prop", ttl=3600, threshold=0.9)
+        
+        # Analyzed proposals are persisted in batches off the request path
+        self.analysis_writer = BatchWriter(self._write_proposals, name="proposal-writer")
         
         # Mock storage for proposals (in production, would use database)
         self.proposals = {}
@@ -31,6 +47,16 @@ class ProposalService:
         Analyze a governance proposal using AI
         """
         try:
+            # The analysis depends on the DAO's context, so only the same DAO can reuse it
+            cache_text = f"{request.dao_address}|{request.title}|{request.description}"
+            cached = await self.analysis_cache.get(cache_text)
+            if cached is not None:
+                analysis_response = ProposalAnalysisResponse.model_validate_json(cached).model_copy(
+                    update={'proposal_id': request.proposal_id, 'dao_address': request.dao_address}
+                )
+                self.analyses[request.proposal_id] = analysis_response.model_dump()
+                return analysis_response
+            
             # Get DAO context for analysis
             dao_data = await self.dao_service._get_dao_data(request.dao_address)
             
@@ -38,7 +64,7 @@ class ProposalService:
             ai_analysis = await self.ai_service.analyze_proposal(
                 request.description,
                 request.proposer,
-                dao_data
+                dao_data.to_dict()
             )
             
             # Create analysis response
@@ -57,7 +83,10 @@ class ProposalService:
             )
             
             # Store analysis for later retrieval
-            self.analyses[request.proposal_id] = analysis_response.dict()
+            self.analyses[request.proposal_id] = analysis_response.model_dump()
+            await self.analysis_cache.set(
+                cache_text, analysis_response.model_dump_json(), tag=request.proposal_id
+            )
             
             return analysis_response
         except Exception as e:
@@ -95,6 +124,18 @@ class ProposalService:
         Get AI predictions for upcoming proposals
         """
         try:
+            # Stored proposals with an AI prediction are read in a single query
+            try:
+                async with SessionLocal() as session:
+                    stored = await get_analyzed_proposals(session, dao_address, limit)
+                if stored:
+                    return [
+                        self._prediction_from_stored(proposal)
+                        for proposal in stored
+                    ]
+            except Exception as e:
+                logger.warning(f"Stored proposal lookup failed, using mock predictions: {e}")
+            
             # Mock predictions based on historical data
             predictions = []
             
@@ -128,12 +169,35 @@ class ProposalService:
             logger.error(f"Error getting proposal predictions: {e}")
             return []
     
-    async def store_analysis(self, request: ProposalAnalysisRequest):
+    def _prediction_from_stored(self, proposal) -> Dict[str, Any]:
+        """Build a prediction entry from a stored, analyzed proposal row"""
+        predicted_success = proposal.ai_prediction
+        impact_analysis = proposal.analysis.analysis_data.get('impact_analysis', {}) if proposal.analysis else {}
+        return {
+            'proposal_id': proposal.proposal_id,
+            'title': proposal.title,
+            'predicted_success_rate': predicted_success,
+            'confidence': proposal.ai_confidence if proposal.ai_confidence is not None else 0.5,
+            'estimated_impact': self._get_impact_level(impact_analysis),
+            'trending_topic': None,
+            'key_factors': self._get_prediction_factors(predicted_success),
+            'recommendation': self._get_prediction_recommendation(predicted_success)
+        }
+    
+    async def store_analysis(self, request: ProposalAnalysisRequest, analysis: ProposalAnalysisResponse):
         """
-        Store proposal analysis in background
+        Queue a proposal and its analysis for storage; they are written with the next batch
         """
-        try:
-            # Store proposal data
+        await self.analysis_writer.put((request, analysis))
+    
+    async def _write_proposals(self, records: List[AnalyzedProposal]):
+        """Persist a batch of analyzed proposals in one transaction"""
+        now = datetime.utcnow()
+        
+        # Later submissions of the same proposal win
+        latest = {request.proposal_id: (request, analysis) for request, analysis in records}
+        
+        for request, _ in latest.values():
             self.proposals[request.proposal_id] = {
                 'dao_address': request.dao_address,
                 'title': request.title,
@@ -141,12 +205,52 @@ class ProposalService:
                 'proposer': request.proposer,
                 'voting_start': request.voting_start,
                 'voting_end': request.voting_end,
-                'created_at': datetime.utcnow()
+                'created_at': now
             }
+        
+        async with SessionLocal() as session:
+            # DAOs seen for the first time get a row, so every proposal stays linked
+            await ensure_daos(session, (request.dao_address for request, _ in latest.values()))
             
-            logger.info(f"Stored proposal analysis for {request.proposal_id}")
-        except Exception as e:
-            logger.error(f"Error storing proposal analysis: {e}")
+            rows = [
+                {
+                    'proposal_id': request.proposal_id,
+                    'dao_address': request.dao_address,
+                    'title': request.title,
+                    'description': request.description,
+                    'proposer': request.proposer,
+                    'voting_start': request.voting_start,
+                    'voting_end': request.voting_end,
+                    'status': ProposalStatus.ACTIVE,
+                    'created_at': now,
+                    'ai_prediction': analysis.prediction,
+                    'ai_confidence': analysis.confidence,
+                    'ai_summary': analysis.summary,
+                    'ai_risk_assessment': analysis.risk_assessment,
+                    'ai_recommendations': list(analysis.recommendations)
+                }
+                for request, analysis in latest.values()
+            ]
+            # Re-analysis must not reset a proposal's lifecycle status or creation time
+            await bulk_upsert(session, Proposal, rows, conflict_columns=['proposal_id'],
+                              insert_only=['status', 'created_at'])
+            
+            # Each proposal keeps one full analysis record, replaced on re-analysis
+            await session.execute(
+                delete(ProposalAnalysis).where(ProposalAnalysis.proposal_id.in_(list(latest)))
+            )
+            await session.execute(insert(ProposalAnalysis), [
+                {
+                    'proposal_id': proposal_id,
+                    'analysis_type': 'full',
+                    'analysis_data': analysis.model_dump(mode='json'),
+                    'created_at': now
+                }
+                for proposal_id, (_, analysis) in latest.items()
+            ])
+            await session.commit()
+        
+        logger.info(f"Stored {len(rows)} proposals")
     
     def _get_impact_description(self, impact_analysis: Dict[str, Any]) -> str:
         """Generate impact description from analysis"""
@@ -169,6 +273,21 @@ class ProposalService:
             logger.error(f"Error generating impact description: {e}")
             return "Impact analysis unavailable"
     
+    def _get_impact_level(self, impact_analysis: Dict[str, Any]) -> Optional[str]:
+        """Overall impact level from the mean impact score, or None without scores"""
+        scores = [
+            data['score'] for data in impact_analysis.values()
+            if isinstance(data, dict) and isinstance(data.get('score'), (int, float))
+        ]
+        if not scores:
+            return None
+        mean_score = sum(scores) / len(scores)
+        if mean_score > 0.7:
+            return 'high'
+        elif mean_score > 0.4:
+            return 'medium'
+        return 'low'
+    
     def _generate_voting_recommendation(self, analysis: Dict[str, Any]) -> str:
         """Generate voting recommendation based on analysis"""
         try:
@@ -5,14 +5,14 @@ from typing import Dict, List, Any, Optional
 import logging
 
 from models.schemas import TreasuryAnalysisResponse
-from services.ai_service import AIService
+from services.ai_service import get_ai_service
 
 logger = logging.getLogger(__name__)
 
 class TreasuryService:
     def __init__(self):
         """Initialize treasury service"""
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
     
     async def analyze_treasury(self, dao_address: str) -> TreasuryAnalysisResponse:
         """
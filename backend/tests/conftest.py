@@ -0,0 +1,7 @@
+"""
+Shared pytest configuration
+"""
+import os
+
+# Fail on accidental lazy loads instead of issuing hidden queries
+os.environ.setdefault("AIDA_STRICT_LOADING", "true")
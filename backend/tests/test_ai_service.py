@@ -1,11 +1,14 @@
 """
 Unit tests for AI Service
 """
+import os
 import pytest
 import asyncio
+import joblib
 from unittest.mock import Mock, patch, AsyncMock
 from typing import Dict, Any
 
+import services.ai_service as ai_service_module
 from services.ai_service import AIService
 from services.base_service import BaseService
 
@@ -272,6 +275,112 @@ class TestAIService:
                 assert isinstance(result, float)
                 assert -1.0 <= result <= 1.0
 
+    
+    @pytest.mark.asyncio
+    async def test_summary_and_recommendations_fall_back_on_openai_failure(self, ai_service):
+        """Test summary and recommendations fall back when the OpenAI call raises"""
+        test_text = "This proposal reallocates treasury funds."
+        analysis_results = [0.6, "summary", {"risk_level": "high"}, {"prediction": 0.5, "confidence": 0.5}, {}]
+        
+        with patch.object(ai_service, 'openai_available', True):
+            with patch.object(ai_service, 'openai_client', create=True) as mock_client:
+                mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+                
+                summary = await ai_service._generate_summary(test_text)
+                recommendations = await ai_service._generate_recommendations(analysis_results, {})
+                
+                assert summary == ai_service._get_fallback_summary(test_text)
+                assert "High risk proposal - ensure thorough review" in recommendations
+                assert mock_client.chat.completions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_analyze_proposals_bulk_falls_back_on_batch_failure(self, ai_service):
+        """Test bulk analysis returns fallback results in input order when the batch upload fails"""
+        proposals = [
+            {'proposal_text': "Increase treasury allocation for grants", 'proposer_address': "0x1", 'dao_context': {}},
+            {'proposal_text': "Update governance voting period", 'proposer_address': "0x2", 'dao_context': {}}
+        ]
+
+        with patch.object(ai_service, 'openai_available', False):
+            expected = [await ai_service.analyze_proposal(p['proposal_text'], p['proposer_address'], {})
+                        for p in proposals]
+
+        with patch.object(ai_service, 'openai_available', True):
+            with patch.object(ai_service, 'openai_client', create=True) as mock_client:
+                mock_client.files.create = AsyncMock(side_effect=Exception("API Error"))
+                mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+
+                results = await ai_service.analyze_proposals_bulk(proposals)
+
+                assert [r['summary'] for r in results] == [r['summary'] for r in expected]
+                assert [r['prediction'] for r in results] == [r['prediction'] for r in expected]
+                mock_client.batches.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stream_summary_releases_completion_slot_before_client_drains(self, ai_service):
+        """Test a slow stream consumer does not hold the shared completion slot"""
+        def chunk(content):
+            delta = Mock()
+            delta.choices = [Mock()]
+            delta.choices[0].delta.content = content
+            return delta
+
+        async def completion():
+            for content in ("Funds ", "a grants ", "program."):
+                yield chunk(content)
+
+        semaphore = asyncio.Semaphore(1)
+        with patch.dict(ai_service_module._LLM_SEMAPHORES, {asyncio.get_running_loop(): semaphore}), \
+                patch.object(ai_service, 'openai_available', True), \
+                patch.object(ai_service, 'openai_client', create=True) as mock_client:
+            mock_client.chat.completions.create = AsyncMock(return_value=completion())
+
+            stream = ai_service.stream_summary("Fund a grants program for ecosystem tooling")
+            first = await stream.__anext__()
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+            assert first == "Funds "
+            assert not semaphore.locked()
+            assert [delta async for delta in stream] == ["a grants ", "program."]
+
+    def test_completion_slots_are_per_event_loop(self):
+        """Test each event loop gets its own completion semaphore, usable under contention"""
+        async def contend():
+            semaphore = ai_service_module._llm_semaphore()
+
+            async def hold():
+                async with ai_service_module._llm_semaphore():
+                    await asyncio.sleep(0)
+
+            # More holders than slots, so some have to wait on the semaphore
+            await asyncio.gather(*(hold() for _ in range(ai_service_module.OPENAI_MAX_CONCURRENCY + 5)))
+            return semaphore, ai_service_module._llm_semaphore()
+
+        first, again = asyncio.run(contend())
+        second, _ = asyncio.run(contend())
+
+        assert first is again
+        assert second is not first
+        assert len(ai_service_module._LLM_SEMAPHORES) == 1
+
+    def test_corrupt_model_artifact_is_refit_and_replaced(self, tmp_path):
+        """Test an unreadable model artifact is refit and rewritten instead of leaving the model unfitted"""
+        with patch('services.ai_service.MODEL_DIR', str(tmp_path)), \
+                patch.dict('services.ai_service._FITTED_MODELS', clear=True):
+            path = AIService()._model_path()
+            with open(path, 'wb') as f:
+                f.write(b"truncated artifact")
+            ai_service_module._FITTED_MODELS.clear()
+
+            service = AIService()
+
+            assert service.proposal_classifier.classes_.tolist() == [0, 1]
+            assert service._passed_column == 1
+            _, classifier = joblib.load(path)
+            assert classifier.classes_.tolist() == [0, 1]
+            assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
 
 class TestAIServiceIntegration:
     """Integration tests for AI Service"""
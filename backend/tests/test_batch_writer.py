@@ -0,0 +1,138 @@
+"""
+Unit tests for BatchWriter
+"""
+import asyncio
+import logging
+
+import pytest
+
+from services.batch_writer import BatchWriter
+
+
+class Recorder:
+    """Flush callback that records each batch it is given"""
+
+    def __init__(self, fail_on=None, gate=None):
+        self.batches = []
+        self.fail_on = fail_on
+        self.gate = gate
+
+    async def __call__(self, batch):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail_on is not None and self.fail_on in batch:
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(batch))
+
+    @property
+    def records(self):
+        return [record for batch in self.batches for record in batch]
+
+
+class TestBatchWriter:
+    """Test cases for BatchWriter"""
+
+    @pytest.mark.asyncio
+    async def test_full_batches_are_flushed_without_waiting_for_linger(self):
+        """Test records are split into batches of at most max_batch"""
+        flush = Recorder()
+        writer = BatchWriter(flush, max_batch=3, linger=30.0)
+        await writer.start()
+        for record in range(7):
+            await writer.put(record)
+        await asyncio.sleep(0.01)
+
+        assert flush.batches == [[0, 1, 2], [3, 4, 5]]
+        await writer.stop()
+        assert flush.batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_is_flushed_after_linger(self):
+        """Test a batch that never fills is flushed once linger expires"""
+        flush = Recorder()
+        writer = BatchWriter(flush, max_batch=64, linger=0.01)
+        await writer.start()
+        await writer.put("a")
+        await writer.put("b")
+        await asyncio.sleep(0.1)
+
+        assert flush.batches == [["a", "b"]]
+        await writer.stop()
+        assert flush.batches == [["a", "b"]]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("workers", [1, 3])
+    async def test_stop_drains_queued_records(self, workers):
+        """Test every queued record is flushed before stop returns, and the consumers exit"""
+        flush = Recorder()
+        writer = BatchWriter(flush, max_batch=4, linger=30.0, workers=workers)
+        await writer.start()
+        tasks = list(writer._tasks)
+        for record in range(10):
+            await writer.put(record)
+
+        await asyncio.wait_for(writer.stop(), timeout=1.0)
+
+        assert sorted(flush.records) == list(range(10))
+        assert all(task.done() for task in tasks)
+        assert writer._tasks == []
+
+    @pytest.mark.asyncio
+    async def test_records_put_during_stop_are_flushed(self):
+        """Test a record enqueued while stop is waiting on the consumers is not lost"""
+        flush = Recorder()
+        writer = BatchWriter(flush, max_batch=4, linger=30.0)
+        await writer.start()
+        await writer.put("queued")
+        stopping = asyncio.ensure_future(writer.stop())
+        await asyncio.sleep(0)
+        await writer.put("late")
+        await asyncio.wait_for(stopping, timeout=1.0)
+
+        assert flush.records == ["queued", "late"]
+
+    @pytest.mark.asyncio
+    async def test_put_without_start_flushes_directly(self):
+        """Test a writer that was never started writes each record immediately"""
+        flush = Recorder()
+        writer = BatchWriter(flush)
+
+        await writer.put("a")
+        await writer.put("b")
+
+        assert flush.batches == [["a"], ["b"]]
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_flush_error_is_logged_and_writer_continues(self, caplog):
+        """Test a failing batch is logged and later batches are still written"""
+        flush = Recorder(fail_on="bad")
+        writer = BatchWriter(flush, name="test-writer", max_batch=1, linger=30.0)
+        await writer.start()
+        with caplog.at_level(logging.ERROR, logger="services.batch_writer"):
+            await writer.put("bad")
+            await writer.put("good")
+            await writer.stop()
+
+        assert flush.records == ["good"]
+        assert "Error flushing 1 records in test-writer" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_full_queue_makes_put_wait(self):
+        """Test a bounded queue holds producers back until the consumer catches up"""
+        gate = asyncio.Event()
+        flush = Recorder(gate=gate)
+        writer = BatchWriter(flush, max_batch=1, linger=30.0, maxsize=2)
+        await writer.start()
+        for record in range(3):
+            await writer.put(record)
+        await asyncio.sleep(0.01)
+        blocked = asyncio.ensure_future(writer.put(3))
+        await asyncio.sleep(0.01)
+
+        assert writer._queue.full()
+        assert not blocked.done()
+        gate.set()
+        await asyncio.wait_for(blocked, timeout=1.0)
+        await writer.stop()
+        assert flush.records == [0, 1, 2, 3]
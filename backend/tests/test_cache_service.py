@@ -0,0 +1,153 @@
+"""
+Unit tests for the cache service
+"""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from pydantic import BaseModel
+
+from services.cache_service import ResponseCache, SemanticCache
+
+GRANT = (
+    "Transfer {amount} ETH from the community treasury to the grants multisig to fund the "
+    "next round of ecosystem grants for developer tooling, documentation and audits. "
+    "The multisig signers will report spending to the forum every month."
+)
+
+
+class Quote(BaseModel):
+    symbol: str
+    price: float
+
+
+class GatedLoader:
+    """Loader that blocks until released and counts its calls"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        value = self.values[self.calls]
+        self.calls += 1
+        await self.release.wait()
+        return value
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        return SemanticCache("test", threshold=0.9)
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_is_a_hit(self, cache):
+        """Test a reworded text with the same numbers reuses the cached payload"""
+        await cache.set(GRANT.format(amount=5), "five")
+
+        assert await cache.get(GRANT.format(amount=5)) == "five"
+        assert await cache.get(GRANT.format(amount=5).replace("every month", "each month")) == "five"
+
+    @pytest.mark.asyncio
+    async def test_numerically_different_texts_miss(self, cache):
+        """Test texts differing only in an amount or a single digit never share an entry"""
+        await cache.set(GRANT.format(amount=5), "five")
+        await cache.set(GRANT.format(amount="1,500"), "fifteen hundred")
+
+        assert await cache.get(GRANT.format(amount=9)) is None
+        assert await cache.get(GRANT.format(amount="1,600")) is None
+        assert await cache.get(GRANT.format(amount="1,500")) == "fifteen hundred"
+
+    @pytest.mark.asyncio
+    async def test_different_ids_miss(self, cache):
+        """Test the same text keyed under another address is not a near-duplicate"""
+        await cache.set(f"0x{'ab' * 20}|{GRANT.format(amount=5)}", "first dao")
+
+        assert await cache.get(f"0x{'cd' * 20}|{GRANT.format(amount=5)}") is None
+        assert await cache.get(f"0x{'AB' * 20}|{GRANT.format(amount=5)}") == "first dao"
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        return ResponseCache("test", ttl=30)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, cache):
+        """Test concurrent callers for a missing key wait on a single load"""
+        loader = GatedLoader("value")
+        callers = [asyncio.ensure_future(cache.get_or_load("key", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+
+        assert await asyncio.gather(*callers) == ["value"] * 5
+        assert await cache.get_or_load("key", loader) == "value"
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_load(self, cache):
+        """Test cancelling one waiter leaves the load running for the others"""
+        loader = GatedLoader("value")
+        first = asyncio.ensure_future(cache.get_or_load("key", loader))
+        second = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        loader.release.set()
+
+        assert await second == "value"
+        assert first.cancelled()
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_load_discards_stale_value(self, cache):
+        """Test a load started before invalidation is not stored, and later callers reload"""
+        loader = GatedLoader("stale", "fresh")
+        stale = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        await cache.invalidate("key")
+        fresh = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        loader.release.set()
+
+        assert await stale == "stale"
+        assert await fresh == "fresh"
+        assert await cache.get_or_load("key", loader) == "fresh"
+        assert loader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidating_unknown_keys_keeps_no_state(self, cache):
+        """Test invalidating keys that were never loaded leaves nothing behind"""
+        await cache.invalidate(*(f"health:junk-{i}" for i in range(100)))
+
+        assert all(len(value) == 0 for value in vars(cache).values() if isinstance(value, dict))
+
+    @pytest.mark.asyncio
+    async def test_without_redis_values_are_cached_in_process(self, cache):
+        """Test the in-process tier serves repeats when no Redis is configured"""
+        loader = AsyncMock(return_value=Quote(symbol="ETH", price=2000.0))
+
+        first = await cache.get_or_load("quote", loader, model=Quote)
+        second = await cache.get_or_load("quote", loader, model=Quote)
+
+        assert cache._redis is None
+        assert second == first == Quote(symbol="ETH", price=2000.0)
+        loader.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_redis_falls_back_to_in_process(self, cache):
+        """Test Redis errors are tolerated and the in-process tier still serves repeats"""
+        cache._redis = AsyncMock()
+        cache._redis.get.side_effect = ConnectionError("redis down")
+        cache._redis.set.side_effect = ConnectionError("redis down")
+        loader = AsyncMock(return_value=Quote(symbol="ETH", price=2000.0))
+
+        assert await cache.get_or_load("quote", loader, model=Quote) == Quote(symbol="ETH", price=2000.0)
+        assert await cache.get_or_load("quote", loader, model=Quote) == Quote(symbol="ETH", price=2000.0)
+        loader.assert_awaited_once()
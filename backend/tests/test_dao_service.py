@@ -0,0 +1,181 @@
+"""
+Unit tests for DAO Service
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from models.database import DAO, Base, DAOHealthReport, TreasuryAnalysis
+from models.repository import get_dao_summary
+from models.schemas import DAOHealthResponse
+from services.dao_service import DAOMetrics, DAOService
+
+
+def make_metrics(address: str, passed: int, active_members: int, participation: float,
+                 proposals_30d: int, votes_30d: int, assets) -> DAOMetrics:
+    """DAO metrics with the given governance, community and treasury figures"""
+    return DAOMetrics.from_data({
+        'address': address,
+        'name': address,
+        'treasury_value': sum(value for _, value in assets),
+        'total_members': 1000,
+        'active_members': active_members,
+        'total_proposals': 40,
+        'active_proposals': 2,
+        'passed_proposals': passed,
+        'failed_proposals': 40 - passed,
+        'avg_voter_participation': participation,
+        'avg_voting_duration': 72,
+        'treasury_assets': [{'symbol': symbol, 'value_usd': value} for symbol, value in assets],
+        'recent_activity': {
+            'proposals_last_30_days': proposals_30d,
+            'votes_last_30_days': votes_30d,
+            'treasury_changes_last_30_days': 1
+        },
+        'governance_parameters': {'quorum': 0.1}
+    })
+
+
+class TestDAOService:
+    """Test cases for DAOService"""
+
+    @pytest.fixture
+    def daos(self):
+        return {
+            '0xhealthy': make_metrics('0xhealthy', 36, 900, 0.8, 12, 2000,
+                                      [('USDC', 500000), ('ETH', 300000), ('UNI', 200000)]),
+            '0xstruggling': make_metrics('0xstruggling', 8, 150, 0.2, 1, 90, [('XYZ', 50000)]),
+            '0xfailing': make_metrics('0xfailing', 20, 400, 0.5, 4, 500, [('DAI', 10000), ('ETH', 5000)]),
+        }
+
+    @pytest.fixture
+    def dao_service(self, daos):
+        service = DAOService()
+        treasury_scores = {
+            '0xhealthy': (0.8, 0.3, 0.9),
+            '0xstruggling': (0.1, 0.9, 0.2),
+        }
+
+        async def fetch(dao_address):
+            return daos[dao_address]
+
+        async def scores(dao_data):
+            if dao_data.address not in treasury_scores:
+                raise RuntimeError("treasury analysis failed")
+            return treasury_scores[dao_data.address]
+
+        with patch.object(service, '_fetch_dao_data', side_effect=fetch), \
+                patch.object(service, '_treasury_scores', side_effect=scores):
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_analyze_many_matches_analyze_dao_health(self, dao_service, daos):
+        """Test batch scoring through score_many agrees with the per-DAO analysis"""
+        now = datetime(2024, 1, 1)
+        addresses = list(daos)
+
+        batch = await dao_service.analyze_many(addresses)
+        single = [await dao_service.analyze_dao_health(address, now=now) for address in addresses]
+
+        assert [report.dao_address for report in batch] == addresses
+        for many, one in zip(batch, single):
+            for field in ('governance_score', 'financial_score', 'community_score', 'overall_health_score'):
+                assert getattr(many, field) == pytest.approx(getattr(one, field))
+            assert many.risk_factors == one.risk_factors
+            assert many.recommendations == one.recommendations
+        # The failed treasury analysis falls back to the same neutral financial score
+        assert batch[2].financial_score == pytest.approx(0.5)
+        assert len({report.last_updated for report in batch}) == 1
+
+    @pytest.mark.asyncio
+    async def test_analyze_many_empty(self, dao_service):
+        """Test an empty batch returns no reports"""
+        assert await dao_service.analyze_many([]) == []
+
+
+class TestDAODataCache:
+    """Test cases for cached DAO data"""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_refetches_dao_data(self):
+        """Test DAO data is fetched once per TTL, and again after invalidation"""
+        service = DAOService()
+        first = make_metrics('0xdao', 30, 800, 0.7, 10, 1500, [('ETH', 100000)])
+        second = make_metrics('0xdao', 31, 820, 0.7, 11, 1600, [('ETH', 50000)])
+        with patch.object(service, '_fetch_dao_data', side_effect=[first, second]) as fetch:
+            assert await service._get_dao_data('0xdao') is first
+            assert await service._get_dao_data('0xdao') is first
+            await service.invalidate('0xdao')
+            assert await service._get_dao_data('0xdao') is second
+
+        assert fetch.call_count == 2
+
+class TestDAOLookup:
+    """Test cases for stored DAO lookups"""
+
+    @pytest.mark.asyncio
+    async def test_get_dao_by_address_counts_history_without_loading_it(self):
+        """Test the stored DAO carries report and analysis counts, with the histories left unloaded"""
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        address = "0x" + "12" * 20
+        async with sessions() as session:
+            session.add(DAO(address=address, name="Stored DAO"))
+            session.add_all([DAOHealthReport(dao_address=address, overall_health_score=0.5) for _ in range(3)])
+            session.add_all([TreasuryAnalysis(dao_address=address, total_value_usd=1.0) for _ in range(2)])
+            session.add(DAOHealthReport(dao_address="0x" + "34" * 20, overall_health_score=0.5))
+            await session.commit()
+
+        try:
+            with patch('services.dao_service.SessionLocal', sessions):
+                dao = await DAOService().get_dao_by_address(address)
+                async with sessions() as session:
+                    stored, _, _ = await get_dao_summary(session, address)
+        finally:
+            await engine.dispose()
+
+        assert dao['name'] == "Stored DAO"
+        assert dao['health_reports'] == 3
+        assert dao['treasury_analyses'] == 2
+        assert {'health_reports', 'treasury_analyses'}.isdisjoint(stored.__dict__)
+
+
+class TestHealthReportStorage:
+    """Test cases for batched health report writes"""
+
+    @pytest.mark.asyncio
+    async def test_reports_of_new_daos_are_stored(self):
+        """Test reports are stored, with a DAO row created for addresses not seen before"""
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        addresses = ["0x" + "56" * 20, "0x" + "78" * 20]
+        report = DAOHealthResponse(
+            dao_address=addresses[0], overall_health_score=0.7, governance_score=0.8,
+            financial_score=0.6, community_score=0.7, risk_factors=["Low participation"],
+            recommendations=[], last_updated=datetime(2024, 1, 1), analysis_confidence=0.85
+        )
+
+        try:
+            with patch('services.dao_service.SessionLocal', sessions):
+                service = DAOService()
+                await service.report_writer.start()
+                for address in addresses + addresses[:1]:
+                    await service.store_dao_health_report(address, report)
+                await service.report_writer.stop()
+            async with sessions() as session:
+                daos = (await session.execute(select(DAO.address))).scalars().all()
+                reports = (await session.execute(select(DAOHealthReport))).scalars().all()
+        finally:
+            await engine.dispose()
+
+        assert sorted(daos) == sorted(addresses)
+        assert sorted(r.dao_address for r in reports) == sorted(addresses + addresses[:1])
+        assert reports[0].risk_factors == ["Low participation"]
@@ -0,0 +1,165 @@
+"""
+Unit tests for Hathor JSON-RPC batching
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services.hathor_service import HathorService
+
+RPC_URL = "http://node/rpc"
+
+
+class MockNode:
+    """JSON-RPC endpoint that answers batches in reverse order and fails the 'fail' method"""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.payloads = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.payloads.append(payload)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+        calls = payload if isinstance(payload, list) else [payload]
+        replies = [self.reply(call) for call in reversed(calls)]
+        return httpx.Response(200, json=replies if isinstance(payload, list) else replies[0])
+
+    @staticmethod
+    def reply(call):
+        if call['method'] == 'fail':
+            return {'jsonrpc': '2.0', 'id': call['id'], 'error': {'code': -32000, 'message': 'rejected'}}
+        return {'jsonrpc': '2.0', 'id': call['id'], 'result': f"{call['method']}:{call['params']['n']}"}
+
+
+def make_service(node: MockNode, **kwargs) -> HathorService:
+    service = HathorService(**kwargs)
+    service.rpc_url = RPC_URL
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(node))
+    return service
+
+
+class TestRPCBatching:
+    """Test cases for batched JSON-RPC calls"""
+
+    @pytest.mark.asyncio
+    async def test_out_of_order_batch_is_fanned_out_by_id(self):
+        """Test each caller gets its own reply, and an error entry fails only its call"""
+        node = MockNode()
+        service = make_service(node, rpc_max_batch=4, rpc_linger=1.0, rpc_workers=1)
+        await service.rpc_batcher.start()
+        try:
+            results = await asyncio.gather(
+                service._rpc('send', {'n': 1}),
+                service._rpc('fail', {'n': 2}),
+                service._rpc('send', {'n': 3}),
+                service._rpc('query', {'n': 4}),
+                return_exceptions=True
+            )
+        finally:
+            await service.rpc_batcher.stop()
+            await service.aclose()
+
+        assert len(node.payloads) == 1
+        assert [call['id'] for call in node.payloads[0]] == [0, 1, 2, 3]
+        assert results[0] == 'send:1'
+        assert isinstance(results[1], RuntimeError) and 'rejected' in str(results[1])
+        assert results[2] == 'send:3'
+        assert results[3] == 'query:4'
+
+    @pytest.mark.asyncio
+    async def test_single_call_is_sent_as_plain_request(self):
+        """Test a lone call goes out as a JSON-RPC object, not a batch of one"""
+        node = MockNode()
+        service = make_service(node, rpc_max_batch=4, rpc_linger=0.01, rpc_workers=1)
+        await service.rpc_batcher.start()
+        try:
+            result = await service._rpc('send', {'n': 7})
+        finally:
+            await service.rpc_batcher.stop()
+            await service.aclose()
+
+        assert result == 'send:7'
+        assert node.payloads == [{'jsonrpc': '2.0', 'id': 0, 'method': 'send', 'params': {'n': 7}}]
+
+    @pytest.mark.asyncio
+    async def test_missing_reply_fails_only_that_call(self):
+        """Test a call the node did not answer is failed instead of left waiting"""
+        node = MockNode()
+        original = node.reply
+        node.reply = lambda call: {'jsonrpc': '2.0', 'id': 99} if call['id'] == 1 else original(call)
+        service = make_service(node, rpc_max_batch=2, rpc_linger=1.0, rpc_workers=1)
+        await service.rpc_batcher.start()
+        try:
+            results = await asyncio.gather(
+                service._rpc('send', {'n': 1}),
+                service._rpc('send', {'n': 2}),
+                return_exceptions=True
+            )
+        finally:
+            await service.rpc_batcher.stop()
+            await service.aclose()
+
+        assert results[0] == 'send:1'
+        assert isinstance(results[1], RuntimeError)
+
+    @pytest.mark.asyncio
+    async def test_http_error_fails_every_call_in_the_batch(self):
+        """Test a failed POST is raised to every caller in the batch"""
+        service = make_service(MockNode(status_code=503), rpc_max_batch=2, rpc_linger=1.0, rpc_workers=1)
+        await service.rpc_batcher.start()
+        try:
+            results = await asyncio.gather(
+                service._rpc('send', {'n': 1}),
+                service._rpc('send', {'n': 2}),
+                return_exceptions=True
+            )
+        finally:
+            await service.rpc_batcher.stop()
+            await service.aclose()
+
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_stop_sends_pending_calls(self):
+        """Test calls still waiting for their batch to fill are sent and resolved on stop"""
+        node = MockNode()
+        service = make_service(node, rpc_max_batch=16, rpc_linger=30.0, rpc_workers=2)
+        await service.rpc_batcher.start()
+        calls = [asyncio.ensure_future(service._rpc('send', {'n': n})) for n in range(3)]
+        await asyncio.sleep(0.01)
+        assert not any(call.done() for call in calls)
+
+        await asyncio.wait_for(service.rpc_batcher.stop(), timeout=1.0)
+        results = await asyncio.wait_for(asyncio.gather(*calls), timeout=1.0)
+        await service.aclose()
+
+        assert results == ['send:0', 'send:1', 'send:2']
+
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_cancels_its_callers(self):
+        """Test callers of a batch cancelled mid-request are cancelled rather than left waiting"""
+        requested = asyncio.Event()
+
+        async def hang(request):
+            requested.set()
+            await asyncio.Event().wait()
+
+        service = HathorService(rpc_max_batch=1, rpc_linger=0.01, rpc_workers=1)
+        service.rpc_url = RPC_URL
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(hang))
+        await service.rpc_batcher.start()
+        call = asyncio.ensure_future(service._rpc('send', {'n': 1}))
+        await asyncio.wait_for(requested.wait(), timeout=1.0)
+
+        for task in service.rpc_batcher._tasks:
+            task.cancel()
+        await asyncio.gather(*service.rpc_batcher._tasks, return_exceptions=True)
+        service.rpc_batcher._tasks = []
+        await service.aclose()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(call, timeout=1.0)
@@ -0,0 +1,72 @@
+"""
+Unit tests for the ASGI middleware
+"""
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from middleware import CompressionMiddleware
+
+
+async def events(request):
+    async def stream():
+        for i in range(50):
+            yield f"data: {'x' * 40} {i}\n\n"
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def report(request):
+    return JSONResponse({"rows": ["treasury"] * 500})
+
+
+@pytest.fixture
+def client():
+    app = CompressionMiddleware(Starlette(routes=[Route("/events", events), Route("/report", report)]))
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("encoding", ["br", "gzip"])
+    async def test_event_streams_are_not_compressed(self, client, encoding):
+        """Test server-sent events pass through uncompressed whichever encoding is accepted"""
+        async with client:
+            response = await client.get("/events", headers={"Accept-Encoding": encoding})
+
+        assert "content-encoding" not in response.headers
+        assert response.text.startswith("data: ")
+        assert response.text.count("\n\n") == 50
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("encoding", ["br", "gzip"])
+    async def test_large_json_is_compressed(self, client, encoding):
+        """Test regular responses are still compressed with the accepted encoding"""
+        async with client:
+            response = await client.get("/report", headers={"Accept-Encoding": encoding})
+
+        assert response.headers["content-encoding"] == encoding
+        assert response.json() == {"rows": ["treasury"] * 500}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("accept_encoding, expected", [
+        ("br;q=0, gzip", "gzip"),
+        ("gzip, br;q=0.5", "gzip"),
+        ("gzip;q=0.5, br", "br"),
+        ("br;q=0", None),
+        ("gzip;q=0", None),
+        ("zbrx", None),
+        ("identity", None),
+        ("*", "br"),
+        ("*;q=0, gzip", "gzip"),
+    ])
+    async def test_accept_encoding_is_negotiated(self, client, accept_encoding, expected):
+        """Test codings are chosen by q-value, and refused codings (q=0) are never used"""
+        async with client:
+            response = await client.get("/report", headers={"Accept-Encoding": accept_encoding})
+
+        assert response.headers.get("content-encoding") == expected
+        assert response.json() == {"rows": ["treasury"] * 500}
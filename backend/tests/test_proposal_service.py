@@ -0,0 +1,208 @@
+"""
+Unit tests for Proposal Service storage
+"""
+import pytest
+import pytest_asyncio
+from pydantic import ValidationError
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from models.database import DAO, Base, Proposal, ProposalAnalysis
+from models.repository import get_active_proposals
+from models.schemas import ProposalAnalysisRequest, ProposalAnalysisResponse, ProposalStatus, RiskLevel
+from services.proposal_service import ProposalService
+
+DAO_ADDRESS = "0x" + "ab" * 20
+
+
+def proposal(proposal_id: str, title: str) -> ProposalAnalysisRequest:
+    return ProposalAnalysisRequest(
+        dao_address=DAO_ADDRESS,
+        proposal_id=proposal_id,
+        title=title,
+        description=f"{title} for the ecosystem",
+        proposer="0x" + "cd" * 20,
+        voting_end=datetime(2030, 1, 1)
+    )
+
+
+def analysis(proposal_id: str, prediction: float = 0.6, confidence: float = 0.8) -> ProposalAnalysisResponse:
+    return ProposalAnalysisResponse(
+        proposal_id=proposal_id,
+        dao_address=DAO_ADDRESS,
+        prediction=prediction,
+        confidence=confidence,
+        summary=f"Summary of {proposal_id}",
+        risk_assessment=RiskLevel.LOW,
+        recommendations=["Vote early"],
+        sentiment_score=0.3,
+        impact_analysis={
+            'treasury_impact': {'score': 0.9, 'description': 'Large grant'},
+            'governance_impact': {'score': 0.7, 'description': 'New committee'}
+        },
+        created_at=datetime(2024, 1, 1)
+    )
+
+
+@pytest_asyncio.fixture
+async def sessions():
+    """Session factory on a fresh in-memory database"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    with patch('services.proposal_service.SessionLocal', factory):
+        yield factory
+    await engine.dispose()
+
+
+class TestProposalStorage:
+    """Test cases for batched proposal writes"""
+
+    @pytest.mark.asyncio
+    async def test_queued_proposals_are_flushed_on_stop(self, sessions):
+        """Test proposals queued on a running writer are stored, linked to their DAO, on shutdown"""
+        service = ProposalService()
+        await service.analysis_writer.start()
+        await service.store_analysis(proposal("prop_1", "Fund grants"), analysis("prop_1"))
+        await service.store_analysis(proposal("prop_2", "Cut emissions"), analysis("prop_2"))
+        await service.store_analysis(proposal("prop_1", "Fund grants round 2"), analysis("prop_1"))
+        await service.analysis_writer.stop()
+
+        async with sessions() as session:
+            stored = {p.proposal_id: p for p in (await session.execute(select(Proposal))).scalars()}
+            dao = await session.get(DAO, DAO_ADDRESS)
+            active = await get_active_proposals(session, DAO_ADDRESS)
+
+        assert dao is not None
+        assert set(stored) == {"prop_1", "prop_2"}
+        assert stored["prop_1"].title == "Fund grants round 2"
+        assert all(p.dao_address == DAO_ADDRESS for p in stored.values())
+        assert {p.proposal_id for p in active} == {"prop_1", "prop_2"}
+
+    @pytest.mark.asyncio
+    async def test_resubmission_keeps_status_and_created_at(self, sessions):
+        """Test re-storing a proposal updates its content but not its lifecycle fields"""
+        service = ProposalService()
+        await service.store_analysis(proposal("prop_1", "Fund grants"), analysis("prop_1"))
+        created_at = datetime.utcnow() - timedelta(days=3)
+        async with sessions() as session:
+            await session.execute(
+                update(Proposal)
+                .where(Proposal.proposal_id == "prop_1")
+                .values(status=ProposalStatus.PASSED, created_at=created_at)
+            )
+            await session.commit()
+
+        await service.store_analysis(proposal("prop_1", "Fund grants (amended)"), analysis("prop_1"))
+
+        async with sessions() as session:
+            stored = await session.get(Proposal, "prop_1")
+
+        assert stored.title == "Fund grants (amended)"
+        assert stored.status == ProposalStatus.PASSED
+        assert stored.created_at == created_at
+
+    @pytest.mark.asyncio
+    async def test_analysis_results_are_stored_with_the_proposal(self, sessions):
+        """Test the stored row carries the latest analysis, with one analysis record per proposal"""
+        service = ProposalService()
+        await service.store_analysis(proposal("prop_1", "Fund grants"), analysis("prop_1", 0.4, 0.5))
+        await service.store_analysis(proposal("prop_1", "Fund grants"), analysis("prop_1", 0.72, 0.9))
+
+        async with sessions() as session:
+            stored = await session.get(Proposal, "prop_1")
+            records = (await session.execute(select(ProposalAnalysis))).scalars().all()
+
+        assert stored.ai_prediction == pytest.approx(0.72)
+        assert stored.ai_confidence == pytest.approx(0.9)
+        assert stored.ai_summary == "Summary of prop_1"
+        assert stored.ai_risk_assessment == RiskLevel.LOW
+        assert stored.ai_recommendations == ["Vote early"]
+        assert len(records) == 1
+        assert records[0].proposal_id == "prop_1"
+        assert records[0].analysis_data['prediction'] == pytest.approx(0.72)
+
+
+    @pytest.mark.parametrize("dao_address", ["0x" + "ab" * 21, "0x" + "zz" * 20, "dao"])
+    def test_malformed_dao_address_is_rejected(self, dao_address):
+        """Test a request whose address does not fit the 42-character column never reaches the writer"""
+        with pytest.raises(ValidationError):
+            ProposalAnalysisRequest(**{**proposal("prop_1", "Fund grants").model_dump(), 'dao_address': dao_address})
+
+class TestProposalPredictions:
+    """Test cases for predictions built from stored proposals"""
+
+    @pytest.mark.asyncio
+    async def test_stored_analysis_is_reported(self, sessions):
+        """Test a stored proposal reports its own prediction, confidence and impact level"""
+        service = ProposalService()
+        await service.store_analysis(proposal("prop_1", "Fund grants"), analysis("prop_1", 0.6, 0.85))
+
+        predictions = await service.get_proposal_predictions(DAO_ADDRESS)
+
+        assert len(predictions) == 1
+        assert predictions[0]['proposal_id'] == "prop_1"
+        assert predictions[0]['predicted_success_rate'] == pytest.approx(0.6)
+        assert predictions[0]['confidence'] == pytest.approx(0.85)
+        assert predictions[0]['estimated_impact'] == 'high'
+
+    @pytest.mark.asyncio
+    async def test_unanalyzed_proposals_are_skipped(self, sessions):
+        """Test stored proposals without an AI prediction fall back to the mock predictions"""
+        async with sessions() as session:
+            session.add(DAO(address=DAO_ADDRESS))
+            session.add(Proposal(proposal_id="unanalyzed", dao_address=DAO_ADDRESS, title="Pending",
+                                 status=ProposalStatus.ACTIVE))
+            await session.commit()
+
+        predictions = await ProposalService().get_proposal_predictions(DAO_ADDRESS, limit=3)
+
+        assert [p['proposal_id'] for p in predictions] == ["prop_1", "prop_2", "prop_3"]
+
+
+class TestProposalAnalysisCache:
+    """Test cases for reusing cached proposal analyses"""
+
+    @pytest.fixture
+    def service(self):
+        service = ProposalService()
+        dao_data = MagicMock(**{'to_dict.return_value': {'address': DAO_ADDRESS}})
+        ai_analysis = {
+            'prediction': {'prediction': 0.7},
+            'confidence': 0.8,
+            'summary': 'Funds a grants round',
+            'risk_assessment': {'risk_level': 'low'},
+            'key_points': [],
+            'recommendations': [],
+            'sentiment_score': 0.2,
+            'impact_analysis': {}
+        }
+        with patch.object(service.dao_service, '_get_dao_data', AsyncMock(return_value=dao_data)), \
+                patch.object(service.ai_service, 'analyze_proposal', AsyncMock(return_value=ai_analysis)):
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_only_the_same_dao_and_amounts_reuse_an_analysis(self, service):
+        """Test a repeat is served from cache, but another DAO or another amount is analyzed afresh"""
+        def request(proposal_id, amount, dao_address=DAO_ADDRESS):
+            return proposal(proposal_id, f"Transfer {amount} ETH to the grants multisig").model_copy(
+                update={'dao_address': dao_address}
+            )
+
+        await service.analyze_proposal(request("prop_1", 5))
+        repeat = await service.analyze_proposal(request("prop_2", 5))
+        assert service.ai_service.analyze_proposal.await_count == 1
+        assert repeat.proposal_id == "prop_2"
+
+        await service.analyze_proposal(request("prop_3", 9))
+        assert service.ai_service.analyze_proposal.await_count == 2
+
+        other_dao = "0x" + "ef" * 20
+        analysis = await service.analyze_proposal(request("prop_4", 5, other_dao))
+        assert service.ai_service.analyze_proposal.await_count == 3
+        assert analysis.dao_address == other_dao